@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Pack normalized sprite frames into power-of-two texture atlases with engine metadata."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from PIL import Image
+except ImportError as exc:  # pragma: no cover
+    raise SystemExit(
+        "Pillow is required. Install it with `python3 -m pip install pillow`."
+    ) from exc
+
+from sprite_cache import BuildCache, add_cache_arguments
+
+
+NUMBER_RE = re.compile(r"(\d+)")
+
+
+@dataclass
+class Sprite:
+    """One unique frame image; every frame name that shares its pixels points here."""
+
+    image: Image.Image
+    page: int = -1
+    x: int = 0
+    y: int = 0
+
+
+@dataclass(frozen=True)
+class Frame:
+    name: str
+    sprite: Sprite
+    offset: tuple[int, int]
+    source_size: tuple[int, int]
+
+
+def natural_key(path: Path) -> list[int | str]:
+    parts: list[int | str] = []
+    for chunk in NUMBER_RE.split(path.stem):
+        if not chunk:
+            continue
+        if chunk.isdigit():
+            parts.append(int(chunk))
+        else:
+            parts.append(chunk)
+    parts.append(path.suffix)
+    return parts
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Bin-pack the normalized frames of one or more animations into power-of-two "
+            "atlas pages, storing identical frames once, and write Phaser and three.js JSON."
+        )
+    )
+    parser.add_argument(
+        "--frames-dir",
+        action="append",
+        required=True,
+        metavar="[NAME=]DIR",
+        help=(
+            "Directory of PNG frames for one animation. Repeat for each animation. "
+            "The animation is named after the directory unless NAME= is given."
+        ),
+    )
+    parser.add_argument(
+        "--out",
+        required=True,
+        help=(
+            "Output path prefix. Writes <out>-<page>.png pages, <out>.json for Phaser "
+            "(multiatlas) and <out>.three.json with UV rects for three.js."
+        ),
+    )
+    parser.add_argument(
+        "--max-size",
+        type=int,
+        default=2048,
+        help="Largest atlas page edge; must be a power of two. Default: 2048.",
+    )
+    parser.add_argument(
+        "--padding",
+        type=int,
+        default=2,
+        help="Transparent pixels kept between packed frames. Default: 2.",
+    )
+    parser.add_argument(
+        "--trim",
+        action="store_true",
+        help="Trim transparent borders before packing; engines restore them from the metadata.",
+    )
+    add_cache_arguments(parser)
+    return parser.parse_args()
+
+
+def is_power_of_two(value: int) -> bool:
+    return value > 0 and value & (value - 1) == 0
+
+
+def load_animations(specs: list[str]) -> dict[str, list[Path]]:
+    animations: dict[str, list[Path]] = {}
+    for spec in specs:
+        name, sep, directory = spec.partition("=")
+        if not sep:
+            directory, name = spec, Path(spec).name
+        frames = sorted(Path(directory).glob("*.png"), key=natural_key)
+        if not frames:
+            raise SystemExit(f"No PNG frames were found in {directory}.")
+        if name in animations:
+            raise SystemExit(f"Animation {name!r} was given twice; name one with NAME=DIR.")
+        animations[name] = frames
+    return animations
+
+
+def collect_frames(animations: dict[str, list[Path]], trim: bool) -> tuple[list[Frame], list[Sprite]]:
+    frames: list[Frame] = []
+    sprites: dict[bytes, Sprite] = {}
+    for animation, paths in animations.items():
+        for path in paths:
+            image = Image.open(path).convert("RGBA")
+            source_size = image.size
+            offset = (0, 0)
+            if trim:
+                bbox = image.getchannel("A").getbbox() or (0, 0, 1, 1)
+                offset = bbox[:2]
+                image = image.crop(bbox)
+            key = hashlib.sha1(repr(image.size).encode() + image.tobytes()).digest()
+            sprite = sprites.setdefault(key, Sprite(image))
+            frames.append(Frame(f"{animation}/{path.stem}", sprite, offset, source_size))
+    return frames, list(sprites.values())
+
+
+def pack_shelves(
+    sprites: list[Sprite],
+    width: int,
+    height: int,
+    padding: int,
+) -> tuple[list[tuple[Sprite, int, int]], list[Sprite]]:
+    """Place sprites on left-to-right shelves, tallest first; return placements and leftovers."""
+    placed: list[tuple[Sprite, int, int]] = []
+    leftover: list[Sprite] = []
+    shelves: list[list[int]] = []  # [top, shelf height, next free x]
+    next_top = 0
+    for sprite in sorted(sprites, key=lambda item: (item.image.height, item.image.width), reverse=True):
+        w, h = sprite.image.size
+        for shelf in shelves:
+            if h <= shelf[1] and shelf[2] + w <= width:
+                placed.append((sprite, shelf[2], shelf[0]))
+                shelf[2] += w + padding
+                break
+        else:
+            if next_top + h <= height and w <= width:
+                shelves.append([next_top, h, w + padding])
+                placed.append((sprite, 0, next_top))
+                next_top += h + padding
+            else:
+                leftover.append(sprite)
+    return placed, leftover
+
+
+def page_sizes(max_size: int) -> list[tuple[int, int]]:
+    sizes = []
+    edge = 1
+    while edge <= max_size:
+        sizes.extend([(edge, edge), (edge * 2, edge)] if edge * 2 <= max_size else [(edge, edge)])
+        edge *= 2
+    return sorted(sizes, key=lambda size: (size[0] * size[1], size[0]))
+
+
+def pack_pages(sprites: list[Sprite], max_size: int, padding: int) -> list[tuple[int, int]]:
+    """Assign every sprite a page and position; return the power-of-two size of each page."""
+    for sprite in sprites:
+        if sprite.image.width > max_size or sprite.image.height > max_size:
+            raise SystemExit(
+                f"A {sprite.image.width}x{sprite.image.height} frame does not fit in --max-size {max_size}."
+            )
+
+    pages: list[tuple[int, int]] = []
+    remaining = sprites
+    while remaining:
+        area = sum(sprite.image.width * sprite.image.height for sprite in remaining)
+        candidates = [size for size in page_sizes(max_size) if size[0] * size[1] >= area]
+        for width, height in candidates or [(max_size, max_size)]:
+            placed, leftover = pack_shelves(remaining, width, height, padding)
+            if not leftover:
+                break
+        # When no size held everything, this is a full max_size page and the rest spill over.
+        for sprite, x, y in placed:
+            sprite.page, sprite.x, sprite.y = len(pages), x, y
+        pages.append((width, height))
+        remaining = leftover
+    return pages
+
+
+def render_pages(sprites: list[Sprite], pages: list[tuple[int, int]]) -> list[Image.Image]:
+    images = [Image.new("RGBA", size, (0, 0, 0, 0)) for size in pages]
+    for sprite in sprites:
+        images[sprite.page].paste(sprite.image, (sprite.x, sprite.y))
+    return images
+
+
+def phaser_atlas(frames: list[Frame], pages: list[tuple[int, int]], page_names: list[str]) -> dict:
+    textures = [
+        {"image": name, "format": "RGBA8888", "size": {"w": w, "h": h}, "scale": 1, "frames": []}
+        for name, (w, h) in zip(page_names, pages)
+    ]
+    for frame in frames:
+        sprite = frame.sprite
+        w, h = sprite.image.size
+        textures[sprite.page]["frames"].append(
+            {
+                "filename": frame.name,
+                "frame": {"x": sprite.x, "y": sprite.y, "w": w, "h": h},
+                "rotated": False,
+                "trimmed": (w, h) != frame.source_size,
+                "spriteSourceSize": {"x": frame.offset[0], "y": frame.offset[1], "w": w, "h": h},
+                "sourceSize": {"w": frame.source_size[0], "h": frame.source_size[1]},
+            }
+        )
+    return {"textures": textures, "meta": {"app": "build_sprite_atlas.py", "version": "1.0"}}
+
+
+def three_atlas(
+    frames: list[Frame],
+    pages: list[tuple[int, int]],
+    page_names: list[str],
+    animations: dict[str, list[Path]],
+) -> dict:
+    # UVs follow three.js conventions: origin bottom-left, as with the default texture.flipY.
+    entries = {}
+    for frame in frames:
+        sprite = frame.sprite
+        page_w, page_h = pages[sprite.page]
+        w, h = sprite.image.size
+        entries[frame.name] = {
+            "page": sprite.page,
+            "rect": [sprite.x, sprite.y, w, h],
+            "offset": [sprite.x / page_w, 1 - (sprite.y + h) / page_h],
+            "repeat": [w / page_w, h / page_h],
+            "trim": [frame.offset[0], frame.offset[1]],
+            "sourceSize": list(frame.source_size),
+        }
+    return {
+        "pages": [{"image": name, "size": [w, h]} for name, (w, h) in zip(page_names, pages)],
+        "frames": entries,
+        "animations": {name: [f"{name}/{path.stem}" for path in paths] for name, paths in animations.items()},
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    if not is_power_of_two(args.max_size):
+        raise SystemExit("--max-size must be a power of two.")
+    if args.padding < 0:
+        raise SystemExit("--padding cannot be negative.")
+
+    animations = load_animations(args.frames_dir)
+    out = Path(args.out)
+    cache = BuildCache.from_args(args)
+    key = cache.key(
+        __file__,
+        {
+            "out": out.name,
+            "max_size": args.max_size,
+            "padding": args.padding,
+            "trim": args.trim,
+            "animations": {name: [path.stem for path in paths] for name, paths in animations.items()},
+        },
+        [path for paths in animations.values() for path in paths],
+    )
+    hit = cache.restore(key, out.parent)
+    if hit is not None:
+        print(f"Packed {hit['frames']} frames ({hit['unique']} unique) into {hit['pages']} page(s): cached.")
+        return
+
+    frames, sprites = collect_frames(animations, args.trim)
+    pages = pack_pages(sprites, args.max_size, args.padding)
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    page_names = [f"{out.name}-{index}.png" for index in range(len(pages))]
+    for name, image in zip(page_names, render_pages(sprites, pages)):
+        image.save(out.parent / name)
+
+    out.with_name(f"{out.name}.json").write_text(
+        json.dumps(phaser_atlas(frames, pages, page_names), indent=2) + "\n", encoding="utf-8"
+    )
+    out.with_name(f"{out.name}.three.json").write_text(
+        json.dumps(three_atlas(frames, pages, page_names, animations), indent=2) + "\n", encoding="utf-8"
+    )
+    cache.store(
+        key,
+        out.parent,
+        [*page_names, f"{out.name}.json", f"{out.name}.three.json"],
+        {"frames": len(frames), "unique": len(sprites), "pages": len(pages)},
+    )
+    sizes = ", ".join(f"{w}x{h}" for w, h in pages)
+    print(f"Packed {len(frames)} frames ({len(sprites)} unique) into {len(pages)} page(s): {sizes}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,8 @@ except ImportError as exc:  # pragma: no cover
         "Pillow is required. Install it with `python3 -m pip install pillow`."
     ) from exc
 
+from sprite_cache import BuildCache, add_cache_arguments
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -41,6 +43,7 @@ def parse_args() -> argparse.Namespace:
         default=1024,
         help="Size of the square transparent canvas in pixels. Default: 1024.",
     )
+    add_cache_arguments(parser)
     return parser.parse_args()
 
 
@@ -65,6 +68,16 @@ def main() -> None:
     if strip_width > args.canvas_size or args.slot_size > args.canvas_size:
         raise SystemExit("Frame slots do not fit inside the requested canvas size.")
 
+    out_path = Path(args.out)
+    cache = BuildCache.from_args(args)
+    key = cache.key(
+        __file__,
+        {"out": out_path.name, "frames": args.frames, "slot_size": args.slot_size, "canvas_size": args.canvas_size},
+        [Path(args.seed)],
+    )
+    if cache.restore(key, out_path.parent) is not None:
+        return
+
     seed = Image.open(args.seed).convert("RGBA")
     seed = resize_seed(seed, args.slot_size)
 
@@ -77,9 +90,9 @@ def main() -> None:
     paste_y = slot_top + (args.slot_size - seed.height) // 2
     canvas.alpha_composite(seed, (paste_x, paste_y))
 
-    out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     canvas.save(out_path)
+    cache.store(key, out_path.parent, [out_path.name], True)
 
 
 if __name__ == "__main__":
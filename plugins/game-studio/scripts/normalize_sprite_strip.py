@@ -4,8 +4,14 @@
 from __future__ import annotations
 
 import argparse
+import glob
+import json
+import os
+import re
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, TypeVar
 
 try:
     from PIL import Image
@@ -14,6 +20,43 @@ except ImportError as exc:  # pragma: no cover
         "Pillow is required. Install it with `python3 -m pip install pillow`."
     ) from exc
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from sprite_cache import BuildCache, add_cache_arguments
+
+
+AUTO_FRAMES = "auto"
+DEFAULT_MIN_GAP = 4
+
+# Optional "-raw" and "-<N>f" suffixes on a strip's file name, e.g. "run-raw-6f.png".
+STRIP_NAME_RE = re.compile(r"^(?P<name>.+?)(?:[-_]raw)?(?:[-_](?P<frames>\d+)f)?$")
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class StripJob:
+    input: Path
+    out_dir: Path
+    frames: int | str
+    anchor: Path | None = None
+    lock_frame1: bool = False
+
+
+def frame_count(value: str) -> int | str:
+    if value == AUTO_FRAMES:
+        return value
+    try:
+        frames = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a positive integer or `auto`") from None
+    if frames < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return frames
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -22,13 +65,43 @@ def parse_args() -> argparse.Namespace:
             "global scale and bottom-center alignment."
         )
     )
-    parser.add_argument("--input", required=True, help="Path to the raw strip image.")
-    parser.add_argument("--out-dir", required=True, help="Output directory for frames.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Path to the raw strip image.")
+    source.add_argument(
+        "--manifest",
+        help=(
+            "JSON list of strips to normalize in one batch. Each entry needs `input` and "
+            "may set `frames`, `out_dir`, `anchor` and `lock_frame1`."
+        ),
+    )
+    source.add_argument(
+        "--glob",
+        help=(
+            "Glob of raw strips to normalize in one batch. A `-<N>f` file name suffix, "
+            "as in `run-raw-6f.png`, overrides --frames for that strip."
+        ),
+    )
+    parser.add_argument(
+        "--out-dir",
+        required=True,
+        help="Output directory for frames. In batch mode, the root for one directory per strip.",
+    )
     parser.add_argument(
         "--frames",
+        type=frame_count,
+        help=(
+            "Number of horizontal frames in the strip, or `auto` to split at transparent gaps "
+            "for unevenly spaced strips. In batch mode, the default per strip."
+        ),
+    )
+    parser.add_argument(
+        "--min-gap",
         type=int,
-        required=True,
-        help="Number of horizontal frames in the strip.",
+        default=DEFAULT_MIN_GAP,
+        help=(
+            "With --frames auto, the narrowest run of empty columns that separates two frames. "
+            f"Default: {DEFAULT_MIN_GAP}."
+        ),
     )
     parser.add_argument(
         "--frame-size",
@@ -51,6 +124,18 @@ def parse_args() -> argparse.Namespace:
         default=8,
         help="Pixels with alpha above this threshold count as sprite content. Default: 8.",
     )
+    parser.add_argument(
+        "--shared-scale",
+        action="store_true",
+        help="In batch mode, use one scale for every strip so a character set stays the same size.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used in batch mode. Default: CPU count.",
+    )
+    add_cache_arguments(parser)
     return parser.parse_args()
 
 
@@ -66,16 +151,97 @@ def crop_to_content(image: Image.Image, alpha_threshold: int) -> Image.Image | N
     return image.crop(bbox)
 
 
-def split_strip(strip: Image.Image, frames: int) -> list[Image.Image]:
+def slot_bounds(width: int, frames: int) -> list[tuple[int, int]]:
     if frames < 1:
         raise ValueError("frames must be at least 1")
-    step = strip.width / frames
-    slots: list[Image.Image] = []
-    for index in range(frames):
-        left = int(round(index * step))
-        right = int(round((index + 1) * step))
-        slots.append(strip.crop((left, 0, right, strip.height)))
-    return slots
+    step = width / frames
+    return [(int(round(index * step)), int(round((index + 1) * step))) for index in range(frames)]
+
+
+def split_strip(strip: Image.Image, frames: int) -> list[Image.Image]:
+    return [strip.crop((left, 0, right, strip.height)) for left, right in slot_bounds(strip.width, frames)]
+
+
+def alpha_mask(image: Image.Image, alpha_threshold: int) -> np.ndarray:
+    return np.asarray(image.getchannel("A")) > alpha_threshold
+
+
+def detect_slots(mask: np.ndarray, min_gap: int) -> list[tuple[int, int]]:
+    """Split the strip at every run of at least min_gap empty columns.
+
+    Shorter gaps, such as the space between a body and a detached weapon, stay inside one frame.
+    """
+    occupied = np.concatenate(([0], mask.any(axis=0).view(np.int8), [0]))
+    edges = np.flatnonzero(np.diff(occupied))
+    starts, ends = edges[0::2], edges[1::2]
+    if not len(starts):
+        raise SystemExit("No sprite content was detected in the provided strip.")
+    split = starts[1:] - ends[:-1] >= min_gap
+    cuts = ((ends[:-1][split] + starts[1:][split]) // 2).tolist()
+    bounds = [0, *cuts, mask.shape[1]]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def slot_bboxes(mask: np.ndarray, bounds: list[tuple[int, int]]) -> list[tuple[int, int, int, int] | None]:
+    """Return each slot's content bbox, relative to the slot, from one thresholded mask.
+
+    Matches threshold_bbox on the cropped slot, without re-reading the alpha per slot.
+    """
+    height, width = mask.shape
+    lefts = np.array([left for left, _ in bounds])
+    rights = np.array([right for _, right in bounds])
+    # Column projection of the whole strip, then each slot's first and last occupied column.
+    columns = np.flatnonzero(mask.any(axis=0))
+    first = np.searchsorted(columns, lefts)
+    last = np.searchsorted(columns, rights) - 1
+    filled = (last >= first) & (rights > lefts)
+    # Row projection per slot: OR the columns of each slot together in one reduction.
+    rows = np.logical_or.reduceat(mask, np.minimum(lefts, width - 1), axis=1)
+    top = rows.argmax(axis=0)
+    bottom = height - rows[::-1].argmax(axis=0)
+
+    bboxes: list[tuple[int, int, int, int] | None] = []
+    for index, (left, _) in enumerate(bounds):
+        if not filled[index]:
+            bboxes.append(None)
+            continue
+        bboxes.append(
+            (
+                int(columns[first[index]]) - left,
+                int(top[index]),
+                int(columns[last[index]]) + 1 - left,
+                int(bottom[index]),
+            )
+        )
+    return bboxes
+
+
+def strip_contents(
+    strip: Image.Image,
+    frames: int | str,
+    alpha_threshold: int,
+    min_gap: int = DEFAULT_MIN_GAP,
+) -> list[Image.Image | None]:
+    """Crop every frame of the strip to its content, None for empty frames."""
+    if np is None:
+        if frames == AUTO_FRAMES:
+            raise SystemExit(
+                "NumPy is required for --frames auto. Install it with `python3 -m pip install numpy`."
+            )
+        return [crop_to_content(slot, alpha_threshold) for slot in split_strip(strip, frames)]
+
+    mask = alpha_mask(strip, alpha_threshold)
+    if frames == AUTO_FRAMES:
+        bounds = detect_slots(mask, min_gap)
+    else:
+        bounds = slot_bounds(strip.width, frames)
+    contents: list[Image.Image | None] = []
+    for (left, _), bbox in zip(bounds, slot_bboxes(mask, bounds)):
+        if bbox is None:
+            contents.append(None)
+        else:
+            contents.append(strip.crop((left + bbox[0], bbox[1], left + bbox[2], bbox[3])))
+    return contents
 
 
 def max_content_size(images: Iterable[Image.Image | None]) -> tuple[int, int]:
@@ -117,35 +283,229 @@ def load_anchor(path: str | None, alpha_threshold: int) -> tuple[Image.Image | N
     return anchor, cropped
 
 
-def main() -> None:
-    args = parse_args()
-    if args.frames < 1:
-        raise SystemExit("--frames must be at least 1.")
-    if args.frame_size < 1:
-        raise SystemExit("--frame-size must be positive.")
-    if args.lock_frame1 and not args.anchor:
-        raise SystemExit("--lock-frame1 requires --anchor.")
+def cache_key(
+    cache: BuildCache | None,
+    operation: str,
+    job: StripJob,
+    alpha_threshold: int,
+    min_gap: int,
+    **params: object,
+) -> str | None:
+    if cache is None:
+        return None
+    params.update(operation=operation, frames=job.frames, alpha_threshold=alpha_threshold)
+    if job.frames == AUTO_FRAMES:
+        params["min_gap"] = min_gap
+    return cache.key(__file__, params, [job.input, job.anchor])
+
+
+def measure_strip(
+    job: StripJob,
+    alpha_threshold: int,
+    min_gap: int = DEFAULT_MIN_GAP,
+    cache: BuildCache | None = None,
+) -> tuple[int, int]:
+    key = cache_key(cache, "measure", job, alpha_threshold, min_gap)
+    if cache is not None and (hit := cache.restore(key, job.out_dir)) is not None:
+        return hit[0], hit[1]
 
-    strip = Image.open(args.input).convert("RGBA")
-    slots = split_strip(strip, args.frames)
-    contents = [crop_to_content(slot, args.alpha_threshold) for slot in slots]
-    anchor_image, anchor_content = load_anchor(args.anchor, args.alpha_threshold)
-    max_width, max_height = max_content_size([*contents, anchor_content])
-    scale = min(args.frame_size / max_width, args.frame_size / max_height)
+    strip = Image.open(job.input).convert("RGBA")
+    contents = strip_contents(strip, job.frames, alpha_threshold, min_gap)
+    _, anchor_content = load_anchor(str(job.anchor) if job.anchor else None, alpha_threshold)
+    size = max_content_size([*contents, anchor_content])
+    if cache is not None:
+        cache.store(key, job.out_dir, [], list(size))
+    return size
 
-    out_dir = Path(args.out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+
+def normalize_strip(
+    job: StripJob,
+    frame_size: int,
+    alpha_threshold: int,
+    scale: float | None = None,
+    min_gap: int = DEFAULT_MIN_GAP,
+    cache: BuildCache | None = None,
+) -> int:
+    """Write one strip's frames into job.out_dir and return how many were written.
+
+    When scale is None it is derived from this strip and its anchor alone. A cache
+    hit on the same inputs and parameters copies the stored frames instead.
+    """
+    key = cache_key(
+        cache,
+        "normalize",
+        job,
+        alpha_threshold,
+        min_gap,
+        frame_size=frame_size,
+        scale=scale,
+        lock_frame1=job.lock_frame1,
+    )
+    if cache is not None and (hit := cache.restore(key, job.out_dir)) is not None:
+        return hit
+
+    strip = Image.open(job.input).convert("RGBA")
+    contents = strip_contents(strip, job.frames, alpha_threshold, min_gap)
+    anchor_image, anchor_content = load_anchor(str(job.anchor) if job.anchor else None, alpha_threshold)
+    if scale is None:
+        max_width, max_height = max_content_size([*contents, anchor_content])
+        scale = min(frame_size / max_width, frame_size / max_height)
+
+    job.out_dir.mkdir(parents=True, exist_ok=True)
 
     for index, content in enumerate(contents, start=1):
-        if index == 1 and args.lock_frame1:
+        if index == 1 and job.lock_frame1:
             assert anchor_image is not None
-            if anchor_image.width == args.frame_size and anchor_image.height == args.frame_size:
+            if anchor_image.width == frame_size and anchor_image.height == frame_size:
                 frame = anchor_image
             else:
-                frame = compose_frame(anchor_content, args.frame_size, scale)
+                frame = compose_frame(anchor_content, frame_size, scale)
+        else:
+            frame = compose_frame(content, frame_size, scale)
+        frame.save(job.out_dir / f"{index:02d}.png")
+    if cache is not None:
+        cache.store(key, job.out_dir, [f"{index:02d}.png" for index in range(1, len(contents) + 1)], len(contents))
+    return len(contents)
+
+
+def strip_name(path: Path) -> tuple[str, int | None]:
+    match = STRIP_NAME_RE.match(path.stem)
+    assert match is not None
+    frames = match.group("frames")
+    return match.group("name"), int(frames) if frames else None
+
+
+def make_job(
+    input_path: Path,
+    out_dir: Path | None,
+    out_root: Path,
+    frames: int | str | None,
+    anchor: Path | None,
+    lock_frame1: bool,
+) -> StripJob:
+    name, suffix_frames = strip_name(input_path)
+    frames = frames or suffix_frames
+    if frames is None:
+        raise SystemExit(f"{input_path}: no frame count; set --frames or add a -<N>f suffix.")
+    if frames != AUTO_FRAMES and (not isinstance(frames, int) or frames < 1):
+        raise SystemExit(f"{input_path}: frames must be a positive integer or `auto`.")
+    if lock_frame1 and anchor is None:
+        raise SystemExit(f"{input_path}: lock_frame1 requires an anchor.")
+    return StripJob(input_path, out_dir or out_root / name, frames, anchor, lock_frame1)
+
+
+def manifest_jobs(args: argparse.Namespace) -> list[StripJob]:
+    manifest = Path(args.manifest)
+    entries = json.loads(manifest.read_text(encoding="utf-8"))
+    if isinstance(entries, dict):
+        entries = entries.get("strips", [])
+    if not isinstance(entries, list) or not entries:
+        raise SystemExit("--manifest must hold a non-empty list of strips.")
+
+    base = manifest.parent
+    out_root = Path(args.out_dir)
+    jobs: list[StripJob] = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"input": entry}
+        if "input" not in entry:
+            raise SystemExit("Every --manifest entry needs an `input` path.")
+        if entry.get("anchor"):
+            anchor = base / entry["anchor"]
         else:
-            frame = compose_frame(content, args.frame_size, scale)
-        frame.save(out_dir / f"{index:02d}.png")
+            anchor = Path(args.anchor) if args.anchor else None
+        jobs.append(
+            make_job(
+                base / entry["input"],
+                out_root / entry["out_dir"] if entry.get("out_dir") else None,
+                out_root,
+                entry.get("frames") or args.frames,
+                anchor,
+                bool(entry.get("lock_frame1", args.lock_frame1)),
+            )
+        )
+    return jobs
+
+
+def glob_jobs(args: argparse.Namespace) -> list[StripJob]:
+    paths = sorted(Path(path) for path in glob.glob(args.glob, recursive=True) if Path(path).is_file())
+    if not paths:
+        raise SystemExit("No strips matched --glob.")
+    out_root = Path(args.out_dir)
+    anchor = Path(args.anchor) if args.anchor else None
+    jobs = []
+    for path in paths:
+        # An explicit -<N>f suffix wins over the batch-wide --frames default.
+        _, suffix_frames = strip_name(path)
+        jobs.append(make_job(path, None, out_root, suffix_frames or args.frames, anchor, args.lock_frame1))
+    return jobs
+
+
+def collect(job: StripJob, future: Future[T]) -> T:
+    try:
+        return future.result()
+    except SystemExit as exc:
+        raise SystemExit(f"{job.input}: {exc}") from None
+
+
+def run_batch(jobs: list[StripJob], args: argparse.Namespace) -> None:
+    out_dirs = [job.out_dir.resolve() for job in jobs]
+    if len(set(out_dirs)) != len(out_dirs):
+        raise SystemExit("Two strips in the batch would write to the same output directory.")
+
+    cache = BuildCache.from_args(args)
+    with ProcessPoolExecutor(max_workers=min(args.workers, len(jobs))) as pool:
+        scale = None
+        if args.shared_scale:
+            # One pass to measure every strip, so the whole set shares the tallest pose's scale.
+            futures = [pool.submit(measure_strip, job, args.alpha_threshold, args.min_gap, cache) for job in jobs]
+            sizes = [collect(job, future) for job, future in zip(jobs, futures)]
+            max_width = max(width for width, _ in sizes)
+            max_height = max(height for _, height in sizes)
+            scale = min(args.frame_size / max_width, args.frame_size / max_height)
+
+        futures = [
+            pool.submit(normalize_strip, job, args.frame_size, args.alpha_threshold, scale, args.min_gap, cache)
+            for job in jobs
+        ]
+        for job, future in zip(jobs, futures):
+            written = collect(job, future)
+            print(f"{job.input} -> {job.out_dir} ({written} frames)")
+
+
+def main() -> None:
+    args = parse_args()
+    if args.frame_size < 1:
+        raise SystemExit("--frame-size must be positive.")
+    if args.workers < 1:
+        raise SystemExit("--workers must be at least 1.")
+    if args.min_gap < 1:
+        raise SystemExit("--min-gap must be at least 1.")
+
+    if args.input is None:
+        jobs = manifest_jobs(args) if args.manifest else glob_jobs(args)
+        run_batch(jobs, args)
+        return
+
+    if args.frames is None:
+        raise SystemExit("--frames is required with --input.")
+    if args.lock_frame1 and not args.anchor:
+        raise SystemExit("--lock-frame1 requires --anchor.")
+    if args.shared_scale:
+        raise SystemExit("--shared-scale only applies to --manifest or --glob batches.")
+
+    job = StripJob(
+        Path(args.input),
+        Path(args.out_dir),
+        args.frames,
+        Path(args.anchor) if args.anchor else None,
+        args.lock_frame1,
+    )
+    written = normalize_strip(
+        job, args.frame_size, args.alpha_threshold, min_gap=args.min_gap, cache=BuildCache.from_args(args)
+    )
+    if args.frames == AUTO_FRAMES:
+        print(f"Detected {written} frames in {job.input}.")
 
 
 if __name__ == "__main__":
@@ -15,6 +15,8 @@ except ImportError as exc:  # pragma: no cover
         "Pillow is required. Install it with `python3 -m pip install pillow`."
     ) from exc
 
+from sprite_cache import BuildCache, add_cache_arguments
+
 
 NUMBER_RE = re.compile(r"(\d+)")
 
@@ -50,6 +52,7 @@ def parse_args() -> argparse.Namespace:
         default=8,
         help="Gap between frames in pixels. Default: 8.",
     )
+    add_cache_arguments(parser)
     return parser.parse_args()
 
 
@@ -74,6 +77,12 @@ def main() -> None:
     if not frames:
         raise SystemExit("No PNG frames were found in --frames-dir.")
 
+    out_path = Path(args.out)
+    cache = BuildCache.from_args(args)
+    key = cache.key(__file__, {"out": out_path.name, "columns": args.columns, "gap": args.gap}, frames)
+    if cache.restore(key, out_path.parent) is not None:
+        return
+
     images = [Image.open(path).convert("RGBA") for path in frames]
     frame_width = max(image.width for image in images)
     frame_height = max(image.height for image in images)
@@ -90,9 +99,9 @@ def main() -> None:
         top = row * (frame_height + args.gap) + (frame_height - image.height) // 2
         sheet.alpha_composite(image, (left, top))
 
-    out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     sheet.save(out_path)
+    cache.store(key, out_path.parent, [out_path.name], True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""Content-addressed build cache shared by the sprite pipeline scripts.
+
+A cache key is the SHA-256 of the tool's own source, its parameters and the bytes
+of every input image. Outputs are stored once under objects/<sha[:2]>/<sha> and
+each key's entry lists which object belongs at which output path, so an unchanged
+input and parameter set is restored by copying files instead of decoding,
+cropping, resizing and re-encoding them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Iterable
+
+DEFAULT_CACHE_DIR = Path(".cache/sprite-pipeline")
+CACHE_VERSION = 1
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache-dir",
+        default=str(DEFAULT_CACHE_DIR),
+        help=f"Build cache used to skip unchanged work. Default: {DEFAULT_CACHE_DIR}.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always rebuild and leave the build cache untouched.",
+    )
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildCache:
+    def __init__(self, directory: str | Path | None) -> None:
+        # A None directory disables the cache: every lookup misses and nothing is stored.
+        self.directory = Path(directory) if directory is not None else None
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> BuildCache:
+        return cls(None if args.no_cache else args.cache_dir)
+
+    def key(self, tool: str, params: dict[str, Any], inputs: Iterable[Path | None]) -> str | None:
+        if self.directory is None:
+            return None
+        source = Path(tool)
+        material = {
+            "version": CACHE_VERSION,
+            "tool": source.name,
+            "source": file_digest(source),
+            "params": params,
+            "inputs": [file_digest(path) if path is not None else None for path in inputs],
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    def object_path(self, digest: str) -> Path:
+        assert self.directory is not None
+        return self.directory / "objects" / digest[:2] / digest
+
+    def entry_path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / "entries" / key[:2] / f"{key}.json"
+
+    def restore(self, key: str | None, out_dir: Path) -> Any:
+        """Copy a hit's outputs under out_dir and return its recorded result, or None on a miss."""
+        if key is None:
+            return None
+        try:
+            entry = json.loads(self.entry_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        objects = {name: (digest, self.object_path(digest)) for name, digest in entry["outputs"].items()}
+        if not all(path.exists() for _, path in objects.values()):
+            return None
+        for name, (digest, path) in objects.items():
+            target = out_dir / name
+            # Leave outputs that already match alone, so their mtimes only move when they change.
+            if target.exists() and target.stat().st_size == path.stat().st_size and file_digest(target) == digest:
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(path, target)
+        return entry["result"]
+
+    def store(self, key: str | None, out_dir: Path, outputs: Iterable[str], result: Any = None) -> None:
+        """Record the files named in outputs, relative to out_dir, under key."""
+        if key is None:
+            return
+        recorded = {}
+        for name in outputs:
+            source = out_dir / name
+            digest = file_digest(source)
+            path = self.object_path(digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Batch workers may store the same object at once, so write then rename.
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                shutil.copyfile(source, tmp)
+                tmp.replace(path)
+            recorded[name] = digest
+        entry = self.entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"outputs": recorded, "result": result}), encoding="utf-8")
+        tmp.replace(entry)
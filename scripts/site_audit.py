@@ -1,24 +1,112 @@
 #!/usr/bin/env python3
+import argparse
+import base64
 import json
 import hashlib
+import heapq
+import math
+import mmap
+import os
 import re
+import socket
+import ssl
+import threading
 import time
-from collections import Counter, deque
-from datetime import date
+import uuid
+import zlib
+from array import array
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from contextlib import contextmanager, nullcontext
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from itertools import islice
 from html import unescape
-from html.parser import HTMLParser
+from http import HTTPStatus
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from queue import Empty, Queue
 from urllib.parse import urljoin, urlparse, urlunparse
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
+from urllib.robotparser import RobotFileParser
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
 
 SITES = [
     "https://blazesportsintel.com",
     "https://austinhumphrey.com",
 ]
 MAX_PAGES_PER_SITE = 500
+RISKY_PAGES = 15
 TIMEOUT_S = 20
 USER_AGENT = "BSI-AuditBot/1.0"
+WORKERS = 8
+PER_HOST_LIMIT = 4
+MAX_REDIRECTS = 5
+MAX_BODY_BYTES = 5 * 1024 * 1024
+BODY_CHUNK = 64 * 1024
+DRAIN_LIMIT = 64 * 1024
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+# Only advertise brotli when a decoder is installed; gzip and deflate are stdlib.
+ACCEPT_ENCODING = "br, gzip, deflate" if brotli else "gzip, deflate"
+THROTTLE_STATUSES = {429, 503}
+THROTTLE_RETRIES = 2
+MAX_RETRY_AFTER_S = 120
+AIMD_BACKOFF = 0.5
+BACKOFF_INTERVAL_S = 0.25
+SLOW_LATENCY_FACTOR = 3
+SLOW_LATENCY_FLOOR_MS = 1000
+THROTTLE_EVENT_SAMPLE = 50
+SITEMAP_WORKERS = 4
+SITEMAP_CHUNK = 64 * 1024
+ROUTE_GROUP_DEPTH = 2
+LINK_CHECK_WORKERS = 16
+LINK_CHECK_PER_HOST = 2
+LINK_CHECK_READ = 1024
+LINK_SAMPLE_PAGES = 3
+HEAD_FALLBACK_STATUSES = {400, 403, 405, 501}
+ASSET_WORKERS = 8
+ASSET_PER_HOST = 4
+ASSET_MAX_BYTES = 20 * 1024 * 1024
+ASSET_CACHE_DIR = Path(".cache/site-audit/assets")
+ASSET_CACHE_MAX_BYTES = 256 * 1024 * 1024
+COMPRESSIBLE_TYPES = ("text/", "javascript", "json", "xml", "svg", "wasm")
+UNCOMPRESSED_MIN_BYTES = 1024
+PAGE_WEIGHT_BUDGET = 2 * 1024 * 1024
+PAGE_WEIGHT_TOP = 10
+SHINGLE_WORDS = 5
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 8
+NEAR_DUP_THRESHOLD = 0.85
+UNKNOWN_DEPTH = 0xFFFF
+BLOOM_ERROR_RATE = 0.001
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 50
+PAGERANK_TOLERANCE = 1e-6
+DEEP_PAGE_DEPTH = 4
+GRAPH_SAMPLE = 20
+LATENCY_REGRESSION_RATIO = 1.5
+LATENCY_REGRESSION_MS = 500
+ISSUE_MEASUREMENT_RE = re.compile(r"\s*\(\d+ms\)$")
+LATENCY_PHASES = ("total_ms", "dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+CACHE_PATH = Path(".cache/site-audit/responses.json")
+CACHE_MAX_ENTRIES = 20000
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CHECKPOINT_DIR = Path(".cache/site-audit")
+CHECKPOINT_EVERY = 100
+ARCHIVE_DIR = Path(".cache/site-audit/archive")
+METRICS_WRITE_S = 15
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONITOR_INTERVAL_S = 300
+MONITOR_BUDGET = 100
+MONITOR_SWEEP = 20
+REPLAY_BATCH = 64
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
 ROUTE_PROBE_PATHS = [
     "/about",
     "/contact",
@@ -30,6 +118,7 @@ ROUTE_PROBE_PATHS = [
 ]
 
 
+@lru_cache(maxsize=65536)
 def normalize_url(url: str):
     try:
         p = urlparse(url)
@@ -41,104 +130,749 @@ def normalize_url(url: str):
     return urlunparse((p.scheme, p.netloc, path, "", p.query, ""))
 
 
-class LinkParser(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.links = set()
+# One left-to-right scan over the document that only stops at the tags the audit
+# reads. Script, style and comment bodies are consumed whole so markup inside
+# inline JSON payloads is never counted.
+PAGE_TOKEN_RE = re.compile(
+    r"""<(?:
+        !--.*?-->
+      | (script|style)\b((?:"[^"]*"|'[^']*'|[^'">])*)>.*?</\1\s*>
+      | title\b(?:"[^"]*"|'[^']*'|[^'">])*>(.*?)</title\s*>
+      | (a|h1|meta|link|img|source)\b((?:"[^"]*"|'[^']*'|[^'">])*)>
+    )""",
+    re.I | re.S | re.X,
+)
+ATTR_RE = re.compile(r"""([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+ASSET_RELS = {"stylesheet", "icon", "apple-touch-icon", "mask-icon", "manifest", "preload", "modulepreload"}
 
-    def handle_starttag(self, tag, attrs):
-        if tag.lower() != "a":
-            return
-        href = dict(attrs).get("href")
-        if href:
-            self.links.add(href.strip())
+
+def parse_attrs(text):
+    attrs = {}
+    for m in ATTR_RE.finditer(text):
+        name = m.group(1).lower()
+        if name not in attrs:
+            value = m.group(2) if m.group(2) is not None else m.group(3) if m.group(3) is not None else m.group(4) or ""
+            attrs[name] = unescape(value)
+    return attrs
+
+
+def srcset_urls(srcset):
+    return [candidate.split()[0] for candidate in srcset.split(",") if candidate.strip()]
+
+
+def scan_page(html):
+    hrefs = set()
+    assets = set()
+    meta = {}
+    canonical = ""
+    h1_count = 0
+    title = None
+    for m in PAGE_TOKEN_RE.finditer(html):
+        if m.group(1) is not None:
+            if m.group(1).lower() == "script":
+                src = parse_attrs(m.group(2)).get("src")
+                if src:
+                    assets.add(src.strip())
+            continue
+        tag = m.group(4)
+        if tag is None:
+            if m.group(3) is not None and title is None:
+                title = unescape(m.group(3)).strip()
+            continue
+        tag = tag.lower()
+        if tag == "h1":
+            h1_count += 1
+            continue
+        attrs = parse_attrs(m.group(5))
+        if tag == "a":
+            href = attrs.get("href")
+            if href:
+                hrefs.add(href.strip())
+        elif tag == "meta":
+            key = attrs.get("name") or attrs.get("property")
+            content = attrs.get("content", "").strip()
+            if key and content:
+                meta.setdefault(key.lower(), content)
+        elif tag == "link":
+            rels = set(attrs.get("rel", "").lower().split())
+            href = attrs.get("href", "").strip()
+            if not canonical and "canonical" in rels and href:
+                canonical = href
+            elif rels & ASSET_RELS and href:
+                assets.add(href)
+        else:
+            if attrs.get("src"):
+                assets.add(attrs["src"].strip())
+            assets.update(srcset_urls(attrs.get("srcset", "")))
+    return {
+        "title": title or "",
+        "meta_description": meta.get("description", ""),
+        "og_title": meta.get("og:title", ""),
+        "canonical": canonical,
+        "h1_count": h1_count,
+        "hrefs": hrefs,
+        "assets": assets,
+    }
+
+
+NON_TEXT_RE = re.compile(r"<(script|style|template)\b.*?</\1\s*>|<!--.*?-->", re.I | re.S)
+TAG_RE = re.compile(r"<[^>]*>")
+WORD_RE = re.compile(r"[^\W_]+")
+MINHASH_EMPTY = (1 << 64) - 1
+
+
+def minhash_signature(html):
+    words = WORD_RE.findall(unescape(TAG_RE.sub(" ", NON_TEXT_RE.sub(" ", html))).lower())
+    shingles = {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    # One-permutation MinHash: a single stable 64-bit hash per shingle picks a
+    # bin and competes for that bin's minimum, so cost is linear in shingles.
+    mins = [MINHASH_EMPTY] * MINHASH_PERMUTATIONS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        slot, value = h % MINHASH_PERMUTATIONS, h // MINHASH_PERMUTATIONS
+        if value < mins[slot]:
+            mins[slot] = value
+    # Short pages leave bins empty; each borrows the next filled bin to its right,
+    # offset by the distance, so the signature stays a valid Jaccard estimator.
+    filled = [i for i, value in enumerate(mins) if value != MINHASH_EMPTY]
+    if filled and len(filled) < MINHASH_PERMUTATIONS:
+        dense = list(mins)
+        for i in range(MINHASH_PERMUTATIONS):
+            if mins[i] == MINHASH_EMPTY:
+                step = next(d for d in range(1, MINHASH_PERMUTATIONS) if mins[(i + d) % MINHASH_PERMUTATIONS] != MINHASH_EMPTY)
+                dense[i] = (mins[(i + step) % MINHASH_PERMUTATIONS] + step * 0x9E3779B97F4A7C15) % MINHASH_EMPTY
+        mins = dense
+    return array("Q", mins)
+
+
+class NearDuplicateIndex:
+    def __init__(self, bands=LSH_BANDS, threshold=NEAR_DUP_THRESHOLD):
+        self.rows = MINHASH_PERMUTATIONS // bands
+        self.bands = bands
+        self.threshold = threshold
+        self.urls = []
+        self.signatures = []
+        self._buckets = {}
+        self._parent = []
+
+    def _find(self, i):
+        while self._parent[i] != i:
+            self._parent[i] = self._parent[self._parent[i]]
+            i = self._parent[i]
+        return i
+
+    def similarity(self, a, b):
+        sa, sb = self.signatures[a], self.signatures[b]
+        return sum(x == y for x, y in zip(sa, sb)) / len(sa)
+
+    def add(self, url, signature):
+        idx = len(self.urls)
+        self.urls.append(url)
+        self.signatures.append(signature)
+        self._parent.append(idx)
+        # Each band bucket remembers only its first member. Checking a new page
+        # against that one representative per band keeps insertion linear even
+        # when thousands of identical shells land in the same bucket.
+        for band in range(self.bands):
+            key = (band, tuple(signature[band * self.rows : (band + 1) * self.rows]))
+            rep = self._buckets.setdefault(key, idx)
+            if rep != idx and self._find(rep) != self._find(idx) and self.similarity(rep, idx) >= self.threshold:
+                self._parent[self._find(idx)] = self._find(rep)
+
+    def groups(self, sample=10):
+        members = defaultdict(list)
+        for idx in range(len(self.urls)):
+            members[self._find(idx)].append(idx)
+        out = []
+        for root, idxs in members.items():
+            if len(idxs) < 2:
+                continue
+            out.append(
+                {
+                    "size": len(idxs),
+                    "similarity": round(min(self.similarity(root, i) for i in idxs), 2),
+                    "urls": [self.urls[i] for i in idxs[:sample]],
+                }
+            )
+        return sorted(out, key=lambda g: g["size"], reverse=True)
 
 
-def extract_first(pattern, text):
-    m = re.search(pattern, text, flags=re.I | re.S)
-    return unescape(m.group(1).strip()) if m else ""
+def looks_like_html(body, content_type):
+    return "text/html" in content_type or "<!doctype html" in body[:1024].lower()
 
 
-def extract_meta(text, key):
-    m = re.search(rf'<meta[^>]+(?:name|property)=["\']{re.escape(key)}["\'][^>]+content=["\']([^"\']+)["\']', text, flags=re.I)
-    return unescape(m.group(1).strip()) if m else ""
+def parse_page(html, base):
+    extracted = scan_page(html)
+    extracted["links"] = resolve_links(extracted.pop("hrefs"), base)
+    extracted["assets"] = resolve_links(extracted["assets"], base)
+    return extracted
 
 
-def extract_links(html, base):
-    parser = LinkParser()
-    parser.feed(html)
+def resolve_links(hrefs, base):
+    p = urlparse(base)
+    origin = f"{p.scheme}://{p.netloc}"
     out = set()
-    for href in parser.links:
-        if href.startswith(("#", "mailto:", "tel:", "javascript:")):
+    for href in hrefs:
+        if href.startswith(("#", "mailto:", "tel:", "javascript:", "data:")):
             continue
-        absolute = normalize_url(urljoin(base, href))
+        if href.startswith("/") and not href.startswith("//") and "/." not in href:
+            # Root-relative hrefs (most Next.js links) skip the general urljoin path.
+            absolute = normalize_url(origin + href)
+        else:
+            absolute = normalize_url(urljoin(base, href))
         if absolute:
             out.add(absolute)
     return sorted(out)
 
 
-def fetch(url):
-    req = Request(url, headers={"User-Agent": USER_AGENT})
+def open_socket(host, port, timeout):
+    phases = {}
+    started = time.perf_counter()
+    addresses = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    phases["dns_ms"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    error = None
+    for family, kind, proto, _, address in addresses:
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.settimeout(timeout)
+            sock.connect(address)
+        except OSError as e:
+            sock.close()
+            error = e
+            continue
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        phases["connect_ms"] = (time.perf_counter() - started) * 1000
+        return sock, phases
+    raise error or OSError(f"could not resolve {host}")
+
+
+class TimedHTTPConnection(HTTPConnection):
+    phases = {}
+
+    def connect(self):
+        self.sock, self.phases = open_socket(self.host, self.port, self.timeout)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    phases = {}
+
+    def connect(self):
+        sock, phases = open_socket(self.host, self.port, self.timeout)
+        started = time.perf_counter()
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+        phases["tls_ms"] = (time.perf_counter() - started) * 1000
+        self.phases = phases
+
+
+class ConnectionPool:
+    def __init__(self, timeout=TIMEOUT_S, max_idle_per_host=PER_HOST_LIMIT):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._ssl_context = ssl.create_default_context()
+
+    def _acquire(self, scheme, netloc):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                self.stats["reused"] += 1
+                return idle.pop(), True
+            self.stats["opened"] += 1
+        return self._connect(scheme, netloc), False
+
+    def _connect(self, scheme, netloc):
+        if scheme == "https":
+            return TimedHTTPSConnection(netloc, timeout=self.timeout, context=self._ssl_context)
+        return TimedHTTPConnection(netloc, timeout=self.timeout)
+
+    def _release(self, scheme, netloc, conn):
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _send(self, method, url, headers, consume, timings, last_hop=True):
+        p = urlparse(url)
+        target = (p.path or "/") + (f"?{p.query}" if p.query else "")
+        conn, reused = self._acquire(p.scheme, p.netloc)
+        started = time.perf_counter()
+        try:
+            conn.request(method, target, headers=headers)
+            resp = conn.getresponse()
+        except (ConnectionError, HTTPException):
+            conn.close()
+            if not reused:
+                raise
+            # The server closed an idle keep-alive socket; retry once on a fresh one.
+            with self._lock:
+                self.stats["stale"] += 1
+                self.stats["opened"] += 1
+            conn = self._connect(p.scheme, p.netloc)
+            started = time.perf_counter()
+            conn.request(method, target, headers=headers)
+            resp = conn.getresponse()
+        # Connection setup happens lazily inside request(); time to first byte
+        # is whatever remains once DNS, TCP and TLS are taken out.
+        responded = time.perf_counter()
+        setup = conn.phases
+        conn.phases = {}
+        for phase, ms in setup.items():
+            timings[phase] += ms
+        timings["ttfb_ms"] += (responded - started) * 1000 - sum(setup.values())
+        # Only a redirect that is about to be followed skips the consumer; a
+        # terminal 3xx or the last allowed hop is decoded like any other response.
+        following = not last_hop and resp.status in REDIRECT_STATUSES and resp.getheader("location")
+        try:
+            if following or consume is None:
+                body = resp.read()
+            else:
+                body = consume(resp)
+        except Exception:
+            conn.close()
+            raise
+        timings["download_ms"] += (time.perf_counter() - responded) * 1000
+        # A consumer that stopped early leaves unread bytes on the socket, so it cannot be reused.
+        if resp.will_close or not resp.isclosed():
+            conn.close()
+        else:
+            self._release(p.scheme, p.netloc, conn)
+        return resp, body
+
+    def request(self, method, url, headers=None, consume=None):
+        headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        timings = Counter({phase: 0.0 for phase in LATENCY_PHASES[1:]})
+        for hop in range(MAX_REDIRECTS + 1):
+            resp, body = self._send(method, url, headers, consume, timings, last_hop=hop == MAX_REDIRECTS)
+            location = resp.getheader("location")
+            if resp.status not in REDIRECT_STATUSES or not location or hop == MAX_REDIRECTS:
+                break
+            url = urljoin(url, location)
+            if resp.status == 303:
+                method = "GET"
+        return {
+            "status": resp.status,
+            "reason": resp.reason,
+            "url": url,
+            "headers": {k.lower(): v for k, v in resp.getheaders()},
+            "body": body,
+            "timings": {phase: int(ms) for phase, ms in timings.items()},
+        }
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+HTTP_POOL = ConnectionPool()
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    # Minimal in-process registry rendered as OpenMetrics text (or classic
+    # Prometheus text for node_exporter's textfile collector). Counter
+    # families are named without `_total`; samples get the suffix on render.
+    FAMILIES = {
+        "site_audit_requests": ("counter", "Pages fetched, by site and HTTP status (0 = network error)."),
+        "site_audit_response_bytes": ("counter", "HTML response bytes, on the wire and decoded."),
+        "site_audit_issues": ("counter", "Audit issues raised, by issue pattern."),
+        "site_audit_cache_revalidations": ("counter", "Pages answered 304 from the conditional-GET cache."),
+        "site_audit_throttle_events": ("counter", "Adaptive rate-limit back-offs, by host and trigger."),
+        "site_audit_frontier_urls": ("gauge", "URLs waiting in the crawl frontier."),
+        "site_audit_in_flight_requests": ("gauge", "Page fetches submitted but not yet audited."),
+        "site_audit_last_page_timestamp_seconds": ("gauge", "Unix time the last page was audited."),
+        "site_audit_request_duration_seconds": ("histogram", "Page fetch latency by phase."),
+    }
+
+    def __init__(self, buckets=LATENCY_BUCKETS_S):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._values = defaultdict(dict)
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted(labels.items()))
+
+    def inc(self, name, labels, value=1):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, labels, value):
+        with self._lock:
+            self._values[name][self._key(labels)] = value
+
+    def observe(self, name, labels, value):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values[name]
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {"counts": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["counts"][i] += 1
+            hist["count"] += 1
+            hist["sum"] += value
+
+    def record_page(self, site, page):
+        labels = {"site": site}
+        self.inc("site_audit_requests", {**labels, "status": str(page["status"])})
+        if page.get("cached"):
+            self.inc("site_audit_cache_revalidations", labels)
+        elif page["is_html"]:
+            self.inc("site_audit_response_bytes", {**labels, "kind": "wire"}, page.get("wire_bytes", page.get("bytes", 0)))
+            self.inc("site_audit_response_bytes", {**labels, "kind": "decoded"}, page.get("bytes", 0))
+        for issue in page["issues"]:
+            self.inc("site_audit_issues", {**labels, "issue": issue_key(issue)})
+        if page["status"]:
+            self.observe("site_audit_request_duration_seconds", {**labels, "phase": "total"}, page["elapsed_ms"] / 1000)
+            for phase, ms in page.get("timings", {}).items():
+                self.observe("site_audit_request_duration_seconds", {**labels, "phase": phase[:-3]}, ms / 1000)
+        self.set("site_audit_last_page_timestamp_seconds", labels, round(time.time(), 3))
+
+    @staticmethod
+    def _labels(pairs):
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in pairs) + "}"
+
+    def render(self, openmetrics=True):
+        with self._lock:
+            snapshot = {name: dict(series) for name, series in self._values.items()}
+        lines = []
+        for name, (kind, help_text) in self.FAMILIES.items():
+            series = snapshot.get(name)
+            if not series:
+                continue
+            family = name if openmetrics or kind != "counter" else f"{name}_total"
+            lines.append(f"# TYPE {family} {kind}")
+            lines.append(f"# HELP {family} {help_text}")
+            for key, value in sorted(series.items()):
+                if kind == "counter":
+                    lines.append(f"{name}_total{self._labels(key)} {value}")
+                elif kind == "gauge":
+                    lines.append(f"{name}{self._labels(key)} {value}")
+                else:
+                    for bound, count in zip(self.buckets, value["counts"]):
+                        lines.append(f"{name}_bucket{self._labels(key + (('le', repr(bound)),))} {count}")
+                    lines.append(f"{name}_bucket{self._labels(key + (('le', '+Inf'),))} {value['count']}")
+                    lines.append(f"{name}_count{self._labels(key)} {value['count']}")
+                    lines.append(f"{name}_sum{self._labels(key)} {round(value['sum'], 6)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/metrics":
+            self.send_error(404)
+            return
+        openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+        body = METRICS.render(openmetrics).encode("utf-8")
+        content_type = "application/openmetrics-text; version=1.0.0" if openmetrics else "text/plain; version=0.0.4"
+        self.send_response(200)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MetricsExporter:
+    # Serves /metrics on a local port and/or rewrites a textfile every few
+    # seconds. A `.prom` textfile gets classic Prometheus text, which is what
+    # node_exporter's textfile collector parses; anything else gets OpenMetrics.
+    def __init__(self, textfile=None, port=None, host="127.0.0.1", every=METRICS_WRITE_S):
+        self.textfile = Path(textfile) if textfile else None
+        self.port = port
+        self.host = host
+        self.every = every
+        self._stop = threading.Event()
+        self._server = None
+        self._writer = None
+
+    def write(self):
+        self.textfile.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.textfile.with_name(self.textfile.name + ".tmp")
+        tmp.write_text(METRICS.render(openmetrics=self.textfile.suffix != ".prom"), encoding="utf-8")
+        tmp.replace(self.textfile)
+
+    def _write_loop(self):
+        while not self._stop.wait(self.every):
+            self.write()
+
+    def __enter__(self):
+        if self.port is not None:
+            self._server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+            self._server.daemon_threads = True
+            # With port 0 the OS picks one, so report the port actually bound.
+            self.port = self._server.server_address[1]
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"Serving metrics on http://{self.host}:{self.port}/metrics")
+        if self.textfile:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.textfile:
+            self.write()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def wanted_type(content_type, types=HTML_TYPES):
+    # No Content-Type at all still gets read so the doctype sniff can decide.
+    return not content_type or any(t in content_type for t in types)
+
+
+class BodyDecoder:
+    # Incremental Content-Encoding decoder, so the body cap applies to decoded
+    # bytes without ever holding the whole compressed response.
+    def __init__(self, encoding):
+        self.encoding = (encoding or "").strip().lower()
+        if self.encoding in {"identity"}:
+            self.encoding = ""
+        self._obj = None
+        self._pending = self.encoding == "deflate"
+        if self.encoding in {"gzip", "x-gzip"}:
+            self._obj = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        elif self.encoding == "br" and brotli:
+            self._obj = brotli.Decompressor()
+        elif self.encoding and not self._pending:
+            raise ValueError(f"Unsupported Content-Encoding: {self.encoding}")
+
+    def decompress(self, chunk):
+        if not self.encoding:
+            return chunk
+        if self._pending:
+            # "deflate" is meant to be zlib-wrapped but some servers send raw
+            # deflate; the zlib header checksum tells them apart.
+            self._pending = False
+            wrapped = len(chunk) >= 2 and chunk[0] & 0x0F == 8 and (chunk[0] << 8 | chunk[1]) % 31 == 0
+            self._obj = zlib.decompressobj(zlib.MAX_WBITS if wrapped else -zlib.MAX_WBITS)
+        if self.encoding == "br":
+            return self._obj.process(chunk)
+        return self._obj.decompress(chunk)
+
+    def flush(self):
+        if self._obj is None or self.encoding == "br":
+            return b""
+        return self._obj.flush()
+
+
+def decode_body(raw, encoding):
+    # Returns None when the body cannot be decoded, e.g. it was cut off mid-stream.
+    try:
+        decoder = BodyDecoder(encoding)
+        return decoder.decompress(raw) + decoder.flush()
+    except Exception:
+        return None
+
+
+def read_body(resp, max_bytes, info, types=HTML_TYPES):
+    content_type = (resp.getheader("content-type") or "").lower()
+    length = resp.getheader("content-length") or ""
+    info["declared"] = int(length) if length.isdigit() else None
+    info["encoding"] = (resp.getheader("content-encoding") or "").strip().lower()
+    if not wanted_type(content_type, types):
+        info["skipped"] = True
+        # Draining a small body is cheaper than a new handshake; anything bigger
+        # is left unread and the pool drops the connection.
+        if info["declared"] is not None and info["declared"] <= DRAIN_LIMIT:
+            resp.read()
+        return b""
+    chunks, total = [], 0
+    try:
+        decoder = BodyDecoder(info["encoding"])
+        while total < max_bytes:
+            raw = resp.read(BODY_CHUNK)
+            if not raw:
+                chunks.append(decoder.flush())
+                break
+            info["wire"] += len(raw)
+            if "raw" in info:
+                info["raw"].append(raw)
+            data = decoder.decompress(raw)
+            chunks.append(data)
+            total += len(data)
+        else:
+            info["truncated"] = total > max_bytes or bool(resp.read(1))
+    except Exception as e:
+        info["decode_error"] = str(e)
+        return b""
+    body = b"".join(chunks)
+    if len(body) > max_bytes:
+        body = body[:max_bytes]
+    return body
+
+
+def fetch(url, headers=None, max_bytes=MAX_BODY_BYTES, types=HTML_TYPES, keep_raw=False):
     started = time.time()
+    info = {"declared": None, "skipped": False, "truncated": False, "wire": 0, "encoding": ""}
+    if keep_raw:
+        info["raw"] = []
+    headers = {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}
     try:
-        with urlopen(req, timeout=TIMEOUT_S) as resp:
-            body = resp.read().decode("utf-8", errors="replace")
-            headers = {k.lower(): v for k, v in resp.getheaders()}
-            return {
-                "ok": True,
-                "status": resp.status,
-                "url": normalize_url(resp.geturl()),
-                "headers": headers,
-                "body": body,
-                "elapsed_ms": int((time.time() - started) * 1000),
-            }
-    except HTTPError as e:
+        resp = HTTP_POOL.request("GET", url, headers, consume=lambda r: read_body(r, max_bytes, info, types))
+    except Exception as e:
         return {
             "ok": False,
-            "status": e.code,
+            "status": 0,
             "url": normalize_url(url),
-            "headers": {k.lower(): v for k, v in (e.headers.items() if e.headers else [])},
+            "headers": {},
             "body": "",
+            "bytes": 0,
+            "wire_bytes": 0,
             "elapsed_ms": int((time.time() - started) * 1000),
             "error": str(e),
         }
-    except (URLError, TimeoutError, Exception) as e:
+    size = info["declared"] if info["skipped"] and info["declared"] is not None else len(resp["body"])
+    wire = info["declared"] if info["skipped"] and info["declared"] is not None else info["wire"]
+    if resp["status"] >= 400:
         return {
             "ok": False,
-            "status": 0,
+            "status": resp["status"],
             "url": normalize_url(url),
-            "headers": {},
+            "headers": resp["headers"],
             "body": "",
+            "bytes": size,
+            "wire_bytes": wire,
             "elapsed_ms": int((time.time() - started) * 1000),
-            "error": str(e),
+            "timings": resp["timings"],
+            "error": f"HTTP Error {resp['status']}: {resp['reason']}",
+            **({"raw": b"".join(info["raw"])} if keep_raw else {}),
         }
+    result = {
+        "ok": True,
+        "status": resp["status"],
+        "url": normalize_url(resp["url"]),
+        "headers": resp["headers"],
+        "body": "" if info["skipped"] else resp["body"].decode("utf-8", errors="replace"),
+        "bytes": size,
+        "wire_bytes": wire,
+        "body_skipped": info["skipped"],
+        "truncated": info["truncated"],
+        "elapsed_ms": int((time.time() - started) * 1000),
+        "timings": resp["timings"],
+    }
+    if info.get("decode_error"):
+        result["error"] = f"Could not decode {info['encoding']} body: {info['decode_error']}"
+    if keep_raw:
+        result["raw"] = b"".join(info["raw"])
+    return result
 
 
-def parse_sitemap(xml):
-    return [normalize_url(unescape(x)) for x in re.findall(r"<loc>(.*?)</loc>", xml, flags=re.I | re.S)]
+def connection_delta(before, after):
+    return {key: after.get(key, 0) - before.get(key, 0) for key in ("opened", "reused", "stale")}
 
 
-def gather_sitemap_urls(base):
-    to_check = deque([f"{base}/sitemap.xml", f"{base}/sitemap_index.xml"])
-    seen = set()
-    pages = set()
-    while to_check:
-        sm = normalize_url(to_check.popleft())
-        if not sm or sm in seen:
-            continue
-        seen.add(sm)
-        res = fetch(sm)
-        if res["status"] >= 400 or "<loc>" not in res["body"]:
-            continue
-        for loc in parse_sitemap(res["body"]):
-            if not loc:
-                continue
-            if loc.endswith(".xml"):
-                if loc not in seen:
-                    to_check.append(loc)
-            else:
-                pages.add(loc)
-    return sorted(pages)
+class SitemapReader:
+    def __init__(self, emit):
+        self.emit = emit
+        self.children = []
+        self._parser = XMLPullParser(events=("end",))
+        self._inflate = None
+        self._sniffed = False
+        self._fields = {}
+
+    def feed(self, chunk):
+        if not self._sniffed:
+            self._sniffed = True
+            if chunk[:2] == b"\x1f\x8b":
+                self._inflate = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._inflate:
+            chunk = self._inflate.decompress(chunk)
+        self._parser.feed(chunk)
+        for _, elem in self._parser.read_events():
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag in {"loc", "lastmod"}:
+                self._fields[tag] = (elem.text or "").strip()
+            elif tag in {"url", "sitemap"}:
+                loc = normalize_url(self._fields.get("loc", ""))
+                if loc and tag == "sitemap":
+                    self.children.append(loc)
+                elif loc:
+                    self.emit(loc, self._fields.get("lastmod", ""))
+                self._fields = {}
+                elem.clear()
+
+    def close(self):
+        self._parser.close()
+
+
+def read_sitemap(url, emit, stop=None):
+    reader = SitemapReader(emit)
+
+    def consume(resp):
+        if resp.status >= 400:
+            return resp.read()
+        while not (stop and stop.is_set()):
+            chunk = resp.read(SITEMAP_CHUNK)
+            if not chunk:
+                reader.close()
+                break
+            reader.feed(chunk)
+        return b""
+
+    try:
+        HTTP_POOL.request("GET", url, consume=consume)
+    except (OSError, HTTPException, ParseError, zlib.error):
+        pass
+    return reader.children
+
+
+def stream_sitemaps(base, emit, stop=None, workers=SITEMAP_WORKERS, extra_roots=()):
+    # Child sitemaps of an index are fetched concurrently; page URLs are emitted
+    # from worker threads as soon as each <url> element closes.
+    roots = list(dict.fromkeys([f"{base}/sitemap.xml", f"{base}/sitemap_index.xml", *extra_roots]))
+    seen = set(roots)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {pool.submit(read_sitemap, url, emit, stop) for url in roots}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for child in future.result():
+                    if child not in seen and not (stop and stop.is_set()):
+                        seen.add(child)
+                        pending.add(pool.submit(read_sitemap, child, emit, stop))
+
+
+def gather_sitemap_urls(base, extra_roots=()):
+    lastmods = {}
+    lock = threading.Lock()
+
+    def emit(url, lastmod):
+        with lock:
+            lastmods.setdefault(url, lastmod)
+
+    stream_sitemaps(base, emit, extra_roots=extra_roots)
+    return dict(sorted(lastmods.items()))
 
 
 def page_issues(page):
@@ -160,6 +894,11 @@ def page_issues(page):
             issues.append("Title too long")
         if page["meta_description"] and not (70 <= len(page["meta_description"]) <= 160):
             issues.append("Meta description length off-range")
+        if page.get("truncated"):
+            issues.append("HTML exceeds body size cap")
+        # Records cached before encodings were tracked have no key and are not flagged.
+        if page["status"] == 200 and page.get("content_encoding") == "" and page.get("bytes", 0) >= UNCOMPRESSED_MIN_BYTES:
+            issues.append("HTML served uncompressed")
     if page["elapsed_ms"] > 3000:
         issues.append(f"Slow response ({page['elapsed_ms']}ms)")
     headers = page["security_headers"]
@@ -172,92 +911,1662 @@ def page_issues(page):
     return issues
 
 
-def crawl_site(site):
-    base = normalize_url(site)
-    origin = f"{urlparse(base).scheme}://{urlparse(base).netloc}"
-    sitemap_urls = gather_sitemap_urls(origin)
+def parse_retry_after(value):
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(int(value), MAX_RETRY_AFTER_S)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0, min((when - datetime.now(timezone.utc)).total_seconds(), MAX_RETRY_AFTER_S))
 
-    queue = deque([base] + sitemap_urls)
-    queued = set(queue)
-    visited = set()
-    pages = []
 
-    while queue and len(pages) < MAX_PAGES_PER_SITE:
-        current = queue.popleft()
-        if current in visited:
-            continue
-        visited.add(current)
+class HostThrottle:
+    # AIMD per host: the in-flight window grows by 1/window on every healthy
+    # response and halves on 429s, 5xx, transport errors (status 0) or latency
+    # spikes, while the spacing between request starts backs off and recovers
+    # the same way. Crawl-delay from robots.txt is the floor for that spacing.
+    def __init__(self, max_concurrency, min_interval=0.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.base_interval = min_interval
+        self.interval = min_interval
+        self.in_flight = 0
+        self.next_at = 0.0
+        self.latency_ewma = None
+        self._cond = threading.Condition()
+
+    def set_min_interval(self, seconds):
+        with self._cond:
+            self.base_interval = seconds
+            self.interval = max(self.interval, seconds)
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                has_room = self.in_flight < max(1, int(self.limit))
+                if has_room and now >= self.next_at:
+                    self.in_flight += 1
+                    self.next_at = now + self.interval
+                    return
+                self._cond.wait(self.next_at - now if has_room else None)
+
+    def release(self, status=None, elapsed_ms=None, retry_after=None):
+        with self._cond:
+            self.in_flight -= 1
+            kind = None
+            if status in THROTTLE_STATUSES:
+                kind = str(status)
+            elif status and status >= 500:
+                kind = "5xx"
+            elif status == 0:
+                kind = "error"
+            elif elapsed_ms is not None and self.latency_ewma is not None:
+                if elapsed_ms > max(SLOW_LATENCY_FLOOR_MS, SLOW_LATENCY_FACTOR * self.latency_ewma):
+                    kind = "slow"
+            if elapsed_ms is not None and status and status < 500:
+                self.latency_ewma = elapsed_ms if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * elapsed_ms
+
+            if kind:
+                self.limit = max(1.0, self.limit * AIMD_BACKOFF)
+                # Only an explicit overload signal widens the spacing; a broken
+                # page returning 500 or one slow route just narrows the window.
+                if kind in {"429", "503"}:
+                    self.interval = max(self.base_interval, self.interval * 2, BACKOFF_INTERVAL_S)
+                if retry_after is not None:
+                    self.next_at = max(self.next_at, time.monotonic() + retry_after)
+            elif status is not None:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.interval = max(self.base_interval, self.interval * 0.75 if self.interval > 0.01 else 0.0)
+            self._cond.notify_all()
+            if kind:
+                return {"kind": kind, "limit": round(self.limit, 2), "interval_ms": int(self.interval * 1000), "retry_after_s": retry_after}
+            return None
+
+
+class HostLimiter:
+    def __init__(self, per_host):
+        self.per_host = max(1, per_host)
+        self.event_counts = Counter()
+        self.events = []
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._started = time.monotonic()
+
+    def throttle(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = HostThrottle(self.per_host)
+        return state
+
+    @contextmanager
+    def slot(self, url):
+        state = self.throttle(url)
+        state.acquire()
+        try:
+            yield
+        finally:
+            state.release()
+
+    def _record(self, url, event):
+        METRICS.inc("site_audit_throttle_events", {"host": urlparse(url).netloc, "kind": event["kind"]})
+        with self._lock:
+            self.event_counts[event["kind"]] += 1
+            if len(self.events) < THROTTLE_EVENT_SAMPLE:
+                self.events.append({"url": url, "at_s": round(time.monotonic() - self._started, 2), **event})
+
+    def fetch(self, url, headers=None, max_bytes=MAX_BODY_BYTES):
+        return self.fetch_with(fetch, url, headers, max_bytes)
+
+    def fetch_with(self, fetcher, url, *args):
+        state = self.throttle(url)
+        for attempt in range(THROTTLE_RETRIES + 1):
+            state.acquire()
+            res = {"status": 0, "elapsed_ms": None, "headers": {}}
+            try:
+                res = fetcher(url, *args)
+            finally:
+                retry_after = parse_retry_after(res.get("headers", {}).get("retry-after"))
+                event = state.release(res["status"], res["elapsed_ms"], retry_after)
+            if event:
+                self._record(url, event)
+            # Throttled requests are retried after the host has backed off; the
+            # acquire() above waits out any Retry-After.
+            if res["status"] not in THROTTLE_STATUSES or attempt == THROTTLE_RETRIES:
+                return res
+        return res
+
+    def report(self):
+        with self._lock:
+            hosts = {host: {"limit": round(s.limit, 2), "interval_ms": int(s.interval * 1000)} for host, s in self._hosts.items()}
+            return {"events": dict(self.event_counts), "sample": list(self.events), "hosts": hosts}
+
+
+def parse_crawl_delay(lines, agent=USER_AGENT):
+    # RobotFileParser drops any Crawl-delay that is not a whole number, so the
+    # delay is read here from the group that matches our agent, else from `*`.
+    token = agent.split("/")[0].lower()
+    groups, agents, in_rules = [], [], False
+    for line in lines:
+        key, _, value = line.split("#", 1)[0].partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if key == "user-agent":
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+            if len(agents) == 1:
+                groups.append((agents, {}))
+        elif key and groups:
+            in_rules = True
+            if key == "crawl-delay":
+                try:
+                    groups[-1][1]["delay"] = max(0.0, float(value))
+                except ValueError:
+                    pass
+    fallback = None
+    for names, rules in groups:
+        if any(name != "*" and name in token for name in names):
+            return rules.get("delay")
+        if "*" in names and fallback is None:
+            fallback = rules.get("delay")
+    return fallback
+
+
+def load_robots(origin):
+    res = fetch(f"{origin}/robots.txt", types=("text/",))
+    robots = RobotFileParser(f"{origin}/robots.txt")
+    robots.audit_crawl_delay = None
+    if res["status"] in {401, 403}:
+        robots.disallow_all = True
+    elif res["status"] == 200:
+        lines = res["body"].splitlines()
+        robots.parse(lines)
+        robots.audit_crawl_delay = parse_crawl_delay(lines)
+    else:
+        # Missing robots.txt, or one we could not reach, does not block our own audit.
+        robots.allow_all = True
+    return robots
+
+
+def robots_delay(robots):
+    delay = getattr(robots, "audit_crawl_delay", None)
+    rate = robots.request_rate(USER_AGENT)
+    seconds = delay or 0.0
+    if rate and rate.requests:
+        seconds = max(seconds, rate.seconds / rate.requests)
+    return seconds
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def validators(self, url):
+        entry = self.entries.get(url)
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url, res):
+        entry = self.entries.get(url)
+        if res["status"] != 304 or not entry:
+            return None
+        entry["used"] = time.time()
+        self.stats["hits"] += 1
+        page = dict(entry["page"])
+        page["elapsed_ms"] = res["elapsed_ms"]
+        page["timings"] = res.get("timings", {})
+        page["cached"] = True
+        return page
+
+    def store(self, url, res, page):
+        etag = res["headers"].get("etag", "")
+        last_modified = res["headers"].get("last-modified", "")
+        if page["status"] != 200 or not (etag or last_modified):
+            self.entries.pop(url, None)
+            return
+        self.entries[url] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "used": time.time(),
+            "page": {k: v for k, v in page.items() if k not in {"issues", "cached"}},
+        }
+        self.stats["stored"] += 1
+
+    def save(self):
+        # Evict least-recently-used entries until both the entry and byte budgets hold.
+        ordered = sorted(self.entries.items(), key=lambda kv: kv[1].get("used", 0), reverse=True)
+        kept, total = {}, 0
+        for url, entry in ordered:
+            size = len(json.dumps(entry))
+            if len(kept) >= self.max_entries or total + size > self.max_bytes:
+                self.stats["evicted"] += 1
+                continue
+            kept[url] = entry
+            total += size
+        self.entries = kept
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(kept), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def build_page(current, res):
+    body = res["body"]
+    content_type = res["headers"].get("content-type", "").lower()
+    is_html = looks_like_html(body, content_type)
+    extracted = parse_page(body, current) if is_html else {}
+
+    return {
+        "url": current,
+        "final_url": res["url"],
+        "status": res["status"],
+        "elapsed_ms": res["elapsed_ms"],
+        "timings": res.get("timings", {}),
+        "content_type": content_type,
+        "bytes": res.get("bytes", 0),
+        "wire_bytes": res.get("wire_bytes", res.get("bytes", 0)),
+        "content_encoding": res["headers"].get("content-encoding", "").strip().lower(),
+        "truncated": res.get("truncated", False),
+        "is_html": is_html,
+        "title": extracted.get("title", ""),
+        "meta_description": extracted.get("meta_description", ""),
+        "og_title": extracted.get("og_title", ""),
+        "canonical": extracted.get("canonical", ""),
+        "h1_count": extracted.get("h1_count", 0),
+        "links": extracted.get("links", []) if res["status"] < 400 else [],
+        "assets": extracted.get("assets", []) if res["status"] < 400 else [],
+        "minhash": list(minhash_signature(body)) if is_html else None,
+        "security_headers": {
+            "strict-transport-security": res["headers"].get("strict-transport-security", ""),
+            "content-security-policy": res["headers"].get("content-security-policy", ""),
+            "x-content-type-options": res["headers"].get("x-content-type-options", ""),
+        },
+    }
+
+
+class LatencyHistogram:
+    # Log-scale buckets about 5% wide: percentile error stays small while memory
+    # stays constant however many samples arrive.
+    GROWTH = 1.05
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+
+    def add(self, ms):
+        self.counts[0 if ms < 1 else int(math.log(ms) / math.log(self.GROWTH)) + 1] += 1
+        self.total += 1
+
+    def percentile(self, q):
+        rank = max(1, math.ceil(q * self.total))
+        running = 0
+        for bucket in sorted(self.counts):
+            running += self.counts[bucket]
+            if running >= rank:
+                return 0 if bucket == 0 else round(self.GROWTH**bucket)
+        return 0
+
+    def summary(self):
+        return {"p50": self.percentile(0.50), "p95": self.percentile(0.95), "p99": self.percentile(0.99)}
+
+
+def route_group(url):
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    if not segments:
+        return "/"
+    if len(segments) == 1:
+        return f"/{segments[0]}"
+    return "/" + "/".join(segments[: min(len(segments) - 1, ROUTE_GROUP_DEPTH)]) + "/*"
+
+
+class UrlTable:
+    # One string and one dict slot per distinct URL; everything else refers to
+    # URLs by their dense integer ID.
+    def __init__(self):
+        self.ids = {}
+        self.urls = []
+
+    def intern(self, url):
+        node = self.ids.get(url)
+        if node is None:
+            node = self.ids[url] = len(self.urls)
+            self.urls.append(url)
+        return node
+
+    def __len__(self):
+        return len(self.urls)
+
+
+class BloomFilter:
+    # Double hashing over one BLAKE2b digest; ~14 bits per URL at a 0.1% false
+    # positive rate, against well over 100 bytes for a set entry and its string.
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE, bits=None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8) if bits is None else bytearray(bits)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        return added
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def state(self):
+        return {"capacity": self.capacity, "error_rate": self.error_rate, "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["capacity"], state["error_rate"], base64.b64decode(state["bits"]))
+
+
+class CrawlFrontier:
+    # In exact mode every URL is interned once; its state, best-known depth and
+    # sitemap flag live in compact arrays indexed by ID, and the queue is a FIFO
+    # of 4-byte IDs per (sitemap, depth) bucket. With a Bloom capacity the
+    # seen-check is probabilistic and nothing is interned, so memory stays flat
+    # however many URLs turn up (a false positive skips a URL, and there is no
+    # link graph in that mode).
+    # Pops come out sitemap URLs first, then by click depth, then FIFO.
+    QUEUED, VISITED = 1, 2
+
+    def __init__(self, bloom_capacity=0, table=None):
+        self.bloom = BloomFilter(bloom_capacity) if bloom_capacity else None
+        self.table = None if self.bloom else table or UrlTable()
+        self.discovered = 0
+        self._state = bytearray()
+        self._depth = array("H")
+        self._sitemap = bytearray()
+        self._buckets = {}
+        self._heads = {}
+        self._pending = 0
+        self._skip = set()
+
+    def _node(self, url):
+        node = self.table.intern(url)
+        grow = len(self.table) - len(self._state)
+        if grow > 0:
+            self._state.extend(bytes(grow))
+            self._depth.extend([UNKNOWN_DEPTH] * grow)
+            self._sitemap.extend(bytes(grow))
+        return node
+
+    def _push(self, item, depth, sitemap):
+        key = (not sitemap, depth)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = deque() if self.bloom else array("I")
+            self._heads[key] = 0
+        bucket.append(item)
+
+    def _take(self):
+        key = min(self._buckets)
+        bucket = self._buckets[key]
+        if self.bloom:
+            item = bucket.popleft()
+            if not bucket:
+                del self._buckets[key], self._heads[key]
+            return key, item
+        head = self._heads[key]
+        item = bucket[head]
+        head += 1
+        if head == len(bucket):
+            del self._buckets[key], self._heads[key]
+        else:
+            if head > 4096 and head * 2 > len(bucket):
+                del bucket[:head]
+                head = 0
+            self._heads[key] = head
+        return key, item
+
+    def add(self, url, depth=UNKNOWN_DEPTH, sitemap=False):
+        depth = min(depth, UNKNOWN_DEPTH)
+        if self.bloom:
+            if not self.bloom.add(url):
+                return False
+            self.discovered += 1
+            self._pending += 1
+            self._push(url, depth, sitemap)
+            return True
+        node = self._node(url)
+        state = self._state[node]
+        if state == self.VISITED:
+            return False
+        if state == self.QUEUED:
+            # Already waiting: re-queue only if this sighting ranks it higher;
+            # the older entry is dropped as stale when it comes up.
+            if not (sitemap and not self._sitemap[node]) and depth >= self._depth[node]:
+                return False
+        else:
+            self._state[node] = self.QUEUED
+            self.discovered += 1
+            self._pending += 1
+        self._sitemap[node] |= sitemap
+        self._depth[node] = min(self._depth[node], depth)
+        self._push(node, self._depth[node], self._sitemap[node])
+        return state != self.QUEUED
+
+    def pop(self):
+        while self._buckets:
+            (not_sitemap, depth), item = self._take()
+            if self.bloom:
+                self._pending -= 1
+                if item in self._skip:
+                    continue
+                return item, depth
+            if self._state[item] != self.QUEUED or (not_sitemap, depth) != (not self._sitemap[item], self._depth[item]):
+                continue
+            self._state[item] = self.VISITED
+            self._pending -= 1
+            return self.table.urls[item], depth
+        return None
+
+    def mark_visited(self, url):
+        if self.bloom:
+            self.bloom.add(url)
+            self._skip.add(url)
+            return
+        node = self._node(url)
+        if self._state[node] == self.QUEUED:
+            self._pending -= 1
+        elif not self._state[node]:
+            self.discovered += 1
+        self._state[node] = self.VISITED
+
+    def __contains__(self, url):
+        if self.bloom:
+            return url in self.bloom
+        node = self.table.ids.get(url)
+        return node is not None and bool(self._state[node])
+
+    def __len__(self):
+        return self._pending
+
+    def state(self, in_flight=()):
+        # In-flight URLs go back in the queue: on resume they are either in the
+        # journal (and skipped) or were never finished.
+        queue = [[url, depth, True] for url, depth in in_flight]
+        if self.bloom:
+            for (not_sitemap, depth), bucket in sorted(self._buckets.items()):
+                queue += [[url, depth, not not_sitemap] for url in bucket if url not in self._skip]
+            return {"queue": queue, "discovered": self.discovered, "bloom": self.bloom.state()}
+        flight = {url for url, _ in in_flight}
+        queue += [
+            [url, self._depth[node], bool(self._sitemap[node])]
+            for node, url in enumerate(self.table.urls)
+            if node < len(self._state) and self._state[node] == self.QUEUED
+        ]
+        seen = [
+            url
+            for node, url in enumerate(self.table.urls)
+            if node < len(self._state) and self._state[node] == self.VISITED and url not in flight
+        ]
+        return {"queue": queue, "seen": seen}
+
+    def restore(self, state):
+        if "queued" in state:
+            # Checkpoints written before the frontier kept depth or seen lists.
+            state = {"queue": [[url, UNKNOWN_DEPTH, False] for url in dict.fromkeys(state["queue"] + state["queued"])], "seen": []}
+        if self.bloom:
+            # The saved queue already holds anything seeded before the restore.
+            if "bloom" in state:
+                self.bloom = BloomFilter.from_state(state["bloom"])
+            self._buckets, self._heads, self._pending = {}, {}, 0
+            self.discovered = state.get("discovered", 0)
+            for url, depth, sitemap in state["queue"]:
+                self.bloom.add(url)
+                self._pending += 1
+                self._push(url, depth, sitemap)
+            return
+        for url in state.get("seen", []):
+            self.mark_visited(url)
+        for url, depth, sitemap in state["queue"]:
+            self.add(url, depth, sitemap)
+
+
+class LinkGraph:
+    # URLs are interned to dense integer IDs and the internal link graph is kept
+    # in CSR form: crawled page i links to targets[offsets[i]:offsets[i + 1]],
+    # and sources[i] is that page's node ID. Nodes include linked URLs that were
+    # never crawled. At 4 bytes per edge, 100k edges fit in well under 1 MiB.
+    def __init__(self, table=None):
+        self.table = table or UrlTable()
+        self.ids = self.table.ids
+        self.urls = self.table.urls
+        self.intern = self.table.intern
+        self.sources = array("I")
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+
+    def add(self, url, links):
+        source = self.intern(url)
+        self.sources.append(source)
+        self.targets.extend(sorted({self.intern(link) for link in links} - {source}))
+        self.offsets.append(len(self.targets))
+
+    def out_edges(self):
+        # node ID -> row in the CSR arrays, or -1 for nodes that were never crawled.
+        rows = array("i", [-1]) * len(self.urls)
+        for row, node in enumerate(self.sources):
+            rows[node] = row
+        return rows
+
+    def depths(self, root):
+        depth = array("i", [-1]) * len(self.urls)
+        if root not in self.ids:
+            return depth
+        rows = self.out_edges()
+        frontier = [self.ids[root]]
+        depth[frontier[0]] = 0
+        level = 0
+        while frontier:
+            level += 1
+            following = []
+            for node in frontier:
+                row = rows[node]
+                if row < 0:
+                    continue
+                for target in self.targets[self.offsets[row] : self.offsets[row + 1]]:
+                    if depth[target] < 0:
+                        depth[target] = level
+                        following.append(target)
+            frontier = following
+        return depth
+
+    def inlinks(self):
+        counts = array("I", [0]) * len(self.urls)
+        for target in self.targets:
+            counts[target] += 1
+        return counts
+
+    def pagerank(self, damping=PAGERANK_DAMPING, iterations=PAGERANK_ITERATIONS, tolerance=PAGERANK_TOLERANCE):
+        n = len(self.urls)
+        if not n:
+            return array("d")
+        rank = array("d", [1.0 / n]) * n
+        has_out = array("b", [0]) * n
+        for row, node in enumerate(self.sources):
+            has_out[node] = self.offsets[row + 1] > self.offsets[row]
+        for _ in range(iterations):
+            # Rank held by pages with no outlinks (including uncrawled ones) is
+            # spread evenly, as if the visitor jumped to a random page.
+            dangling = sum(r for r, out in zip(rank, has_out) if not out)
+            nxt = array("d", [(1 - damping) / n + damping * dangling / n]) * n
+            for row, node in enumerate(self.sources):
+                start, end = self.offsets[row], self.offsets[row + 1]
+                if end > start:
+                    share = damping * rank[node] / (end - start)
+                    for target in self.targets[start:end]:
+                        nxt[target] += share
+            delta = sum(abs(a - b) for a, b in zip(nxt, rank))
+            rank = nxt
+            if delta < tolerance:
+                break
+        return rank
+
+    def report(self, root, sitemap_urls, complete):
+        depth = self.depths(root)
+        inlinks = self.inlinks()
+        rank = self.pagerank()
+        crawled = set(self.sources)
+        levels = Counter(depth[node] for node in crawled if depth[node] >= 0)
+        root_id = self.ids.get(root)
+        orphans = sorted(url for url in sitemap_urls if url != root and (url not in self.ids or inlinks[self.ids[url]] == 0))
+        deep = sorted(node for node in crawled if depth[node] >= DEEP_PAGE_DEPTH)
+        top = sorted(crawled, key=lambda node: rank[node], reverse=True)[:GRAPH_SAMPLE]
+        return {
+            "nodes": len(self.urls),
+            "edges": len(self.targets),
+            "complete": complete,
+            "depth_histogram": {str(level): count for level, count in sorted(levels.items())},
+            "unreachable_pages": sum(1 for node in crawled if depth[node] < 0 and node != root_id),
+            "deep_pages": len(deep),
+            "deep_sample": [{"url": self.urls[node], "depth": depth[node]} for node in deep[:GRAPH_SAMPLE]],
+            "orphan_sitemap_urls": len(orphans),
+            "orphan_sample": orphans[:GRAPH_SAMPLE],
+            "top_pagerank": [
+                {"url": self.urls[node], "pagerank": round(rank[node] * len(self.urls), 3), "inlinks": inlinks[node], "depth": depth[node]}
+                for node in top
+            ],
+        }
+
+
+class CrawlAggregates:
+    def __init__(self, top_k=RISKY_PAGES):
+        self.top_k = top_k
+        self.count = 0
+        self.status_hist = Counter()
+        self.issue_hist = Counter()
+        self.latency = defaultdict(lambda: defaultdict(LatencyHistogram))
+        self.duplicates = NearDuplicateIndex()
+        self.transfer = Counter()
+        self.encodings = Counter()
+        self._risky = []
+
+    def add(self, page):
+        # The page is left untouched: the checkpoint journal needs the signature
+        # so resumed pages are indexed too. emit() drops it from the output record.
+        signature = page.get("minhash")
+        if signature and page["status"] < 400:
+            self.duplicates.add(page["url"], array("Q", signature))
+        self.count += 1
+        self.status_hist[page["status"]] += 1
+        self.issue_hist.update(page["issues"])
+        if page["is_html"] and page["status"] == 200:
+            self.transfer["bytes"] += page.get("bytes", 0)
+            self.transfer["wire_bytes"] += page.get("wire_bytes", page.get("bytes", 0))
+            self.encodings[page.get("content_encoding") or "identity"] += 1
+        if page["status"]:
+            phases = self.latency[route_group(page["url"])]
+            phases["total_ms"].add(page["elapsed_ms"])
+            for phase, ms in page.get("timings", {}).items():
+                phases[phase].add(ms)
+        if not page["issues"]:
+            return
+        # Min-heap on (issue count, -arrival) keeps the k riskiest pages, earliest first on ties.
+        entry = (len(page["issues"]), -self.count, {"url": page["url"], "status": page["status"], "issues": page["issues"]})
+        if len(self._risky) < self.top_k:
+            heapq.heappush(self._risky, entry)
+        else:
+            heapq.heappushpop(self._risky, entry)
+
+    def riskiest(self):
+        return [entry[2] for entry in sorted(self._risky, reverse=True)]
+
+    def latency_report(self):
+        report = {}
+        for group, phases in self.latency.items():
+            report[group] = {"count": phases["total_ms"].total}
+            for phase in LATENCY_PHASES:
+                if phase in phases:
+                    report[group][phase] = phases[phase].summary()
+        return dict(sorted(report.items(), key=lambda kv: kv[1]["total_ms"]["p95"], reverse=True))
+
+
+class NdjsonWriter:
+    def __init__(self, path, append=False, flush=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush = flush
+        self._fh = self.path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, record):
+        self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if self.flush:
+            self._fh.flush()
+
+    def close(self):
+        self._fh.close()
 
-        res = fetch(current)
-        body = res["body"]
-        content_type = res["headers"].get("content-type", "").lower()
-        is_html = "text/html" in content_type or "<!doctype html" in body.lower()
+    def __enter__(self):
+        return self
 
-        page = {
-            "url": current,
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ResponseArchive:
+    # Append-only WARC-style file: each fetched page becomes a `response` record
+    # holding the status line, headers and the body exactly as it came off the
+    # wire (still compressed), and each site ends with a `metadata` record of
+    # its sitemap lastmods. Crawl-side measurements ride along in X-Audit-Meta,
+    # tagged with the crawl's run ID so replay can tell same-day runs apart.
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("ab")
+        self.records = 0
+
+    def _write(self, warc_type, url, content_type, meta, payload):
+        head = (
+            "WARC/1.1\r\n"
+            f"WARC-Type: {warc_type}\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"X-Audit-Meta: {json.dumps(meta, separators=(',', ':'))}\r\n\r\n"
+        )
+        self._fh.write(head.encode("utf-8") + payload + b"\r\n\r\n")
+        self.records += 1
+
+    def write_response(self, site, url, res, lastmod, depth, run=""):
+        meta = {
+            "site": site,
+            "run": run,
             "final_url": res["url"],
-            "status": res["status"],
             "elapsed_ms": res["elapsed_ms"],
+            "timings": res.get("timings", {}),
+            "bytes": res.get("bytes", 0),
+            "wire_bytes": res.get("wire_bytes", 0),
+            "truncated": res.get("truncated", False),
+            "skipped": res.get("body_skipped", False),
+            "lastmod": lastmod,
+            "depth": depth,
+        }
+        if res["status"] == 0:
+            meta["error"] = res.get("error", "")
+            return self._write("metadata", url, "application/json", meta, b"")
+        try:
+            reason = HTTPStatus(res["status"]).phrase
+        except ValueError:
+            reason = ""
+        lines = [f"HTTP/1.1 {res['status']} {reason}"] + [f"{k}: {v}" for k, v in res["headers"].items()]
+        http_head = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1", errors="replace")
+        self._write("response", url, "application/http;msgtype=response", meta, http_head + res.get("raw", b""))
+
+    def write_site(self, site, lastmods, complete, run=""):
+        payload = json.dumps({"lastmods": lastmods, "complete": complete}, separators=(",", ":")).encode("utf-8")
+        self._write("metadata", site, "application/json", {"site": site, "run": run, "site_summary": True}, payload)
+        self._fh.flush()
+
+    def close(self):
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def index_archive(buf):
+    # One pass over the WARC headers only; payloads are skipped via Content-Length.
+    spans, pos, end = [], 0, len(buf)
+    while pos < end:
+        head_end = buf.find(b"\r\n\r\n", pos)
+        if head_end < 0:
+            break
+        fields = {}
+        for line in bytes(buf[pos:head_end]).decode("utf-8", errors="replace").split("\r\n")[1:]:
+            key, _, value = line.partition(":")
+            fields[key.strip().lower()] = value.strip()
+        start = head_end + 4
+        length = int(fields.get("content-length", 0))
+        if start + length > end:
+            break  # a torn final record from an interrupted crawl
+        spans.append((fields.get("warc-type", ""), fields.get("warc-target-uri", ""), json.loads(fields.get("x-audit-meta", "{}")), start, length))
+        pos = start + length + 4
+    return spans
+
+
+def replay_record(buf, url, meta, start, length, max_bytes):
+    res = {
+        "status": 0,
+        "url": meta.get("final_url", url),
+        "headers": {},
+        "body": "",
+        "bytes": meta.get("bytes", 0),
+        "wire_bytes": meta.get("wire_bytes", 0),
+        "truncated": meta.get("truncated", False),
+        "elapsed_ms": meta.get("elapsed_ms", 0),
+        "timings": meta.get("timings", {}),
+    }
+    if length:
+        payload = buf[start : start + length]
+        split = payload.find(b"\r\n\r\n")
+        lines = bytes(payload[:split]).decode("latin-1").split("\r\n")
+        res["status"] = int(lines[0].split(" ", 2)[1])
+        for line in lines[1:]:
+            key, _, value = line.partition(":")
+            res["headers"][key.strip().lower()] = value.strip()
+        raw = bytes(payload[split + 4 :])
+        # Same as fetch(): error bodies are archived but never audited.
+        if not meta.get("skipped") and res["status"] < 400:
+            body = decode_body(raw, res["headers"].get("content-encoding", "")) or b""
+            res["body"] = body[:max_bytes].decode("utf-8", errors="replace")
+    page = build_page(url, res)
+    page["lastmod"] = meta.get("lastmod", "")
+    page["depth"] = meta.get("depth")
+    page["issues"] = page_issues(page)
+    return page
+
+
+def replay_batch(path, records, max_bytes):
+    # Runs in a worker process: each one maps the archive itself, so only
+    # offsets travel in and finished page records travel back.
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return [replay_record(buf, url, meta, start, length, max_bytes) for url, meta, start, length in records]
+
+
+def replay_archive(path, workers=None, max_body_bytes=MAX_BODY_BYTES, sink=None):
+    path = Path(path)
+    if not path.stat().st_size:
+        return []
+    with path.open("rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        spans = index_archive(buf)
+
+    # A dated archive collects every run of that day, so only each site's
+    # latest run is replayed. Within a run the last record per URL wins: a
+    # resumed crawl re-fetches the pages that were in flight when it stopped.
+    latest = {}
+    for _, _, meta, _, _ in spans:
+        if "site" in meta:
+            latest[meta["site"]] = meta.get("run", "")
+    sites, summaries = {}, {}
+    for warc_type, url, meta, start, length in spans:
+        if "site" not in meta or meta.get("run", "") != latest[meta["site"]]:
+            continue
+        if meta.get("site_summary"):
+            with path.open("rb") as fh:
+                fh.seek(start)
+                summaries[meta["site"]] = json.loads(fh.read(length))
+        elif warc_type in {"response", "metadata"}:
+            sites.setdefault(meta["site"], {})[url] = (url, meta, start, length)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for site, by_url in sites.items():
+            records = list(by_url.values())
+            batches = [records[i : i + REPLAY_BATCH] for i in range(0, len(records), REPLAY_BATCH)]
+            stats = CrawlAggregates()
+            graph = LinkGraph()
+            host = urlparse(site).netloc
+            for batch in pool.map(replay_batch, [str(path)] * len(batches), batches, [max_body_bytes] * len(batches)):
+                for page in batch:
+                    stats.add(page)
+                    graph.add(page["url"], [link for link in page["links"] if urlparse(link).netloc == host])
+                    # Page records go to the sink like a streamed crawl's, so --diff can read them.
+                    if sink:
+                        sink({"site": site, **{key: value for key, value in page.items() if key != "minhash"}})
+            summary = summaries.get(site, {"lastmods": {}, "complete": False})
+            results.append(
+                {
+                    "site": site,
+                    "replayed_from": str(path),
+                    "scanned_pages": stats.count,
+                    "discovered_urls": len(graph.urls),
+                    "sitemap_urls": len(summary["lastmods"]),
+                    "resumed_pages": 0,
+                    "status_histogram": dict(sorted(stats.status_hist.items())),
+                    "issue_histogram": dict(stats.issue_hist.most_common()),
+                    "riskiest_pages": stats.riskiest(),
+                    "latency": stats.latency_report(),
+                    "transfer": {**stats.transfer, "encodings": dict(stats.encodings.most_common())},
+                    "near_duplicates": stats.duplicates.groups(),
+                    "link_graph": graph.report(normalize_url(site), summary["lastmods"], summary["complete"]),
+                    "route_probe": [],
+                    "connections": {"opened": 0, "reused": 0, "stale": 0},
+                    "cache": {},
+                }
+            )
+    return results
+
+
+def site_slug(site):
+    return re.sub(r"[^a-z0-9]+", "-", urlparse(site).netloc.lower()).strip("-")
+
+
+class CrawlCheckpoint:
+    def __init__(self, site, directory=CHECKPOINT_DIR, resume=False, every=CHECKPOINT_EVERY):
+        slug = site_slug(site)
+        self.directory = Path(directory)
+        self.frontier_path = self.directory / f"checkpoint-{slug}.json"
+        self.journal_path = self.directory / f"checkpoint-{slug}.pages.ndjson"
+        self.resume = resume
+        self.every = every
+        self._journal = None
+        self._since_save = 0
+        self.completed = 0
+        self.run_id = uuid.uuid4().hex
+
+    def start(self):
+        frontier = None
+        if self.resume and self.frontier_path.exists():
+            try:
+                frontier = json.loads(self.frontier_path.read_text(encoding="utf-8"))
+            except ValueError:
+                frontier = None
+        if frontier and frontier.get("run"):
+            # A resumed crawl is the same run, so its archive records stay together.
+            self.run_id = frontier["run"]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.completed = 0
+        if self.resume and self.journal_path.exists():
+            # Rewrite the journal from the records that parse cleanly, one line
+            # at a time, so resuming a large crawl never holds its pages in memory.
+            tmp = self.journal_path.with_suffix(".tmp")
+            with self.journal_path.open(encoding="utf-8") as src, tmp.open("w", encoding="utf-8") as dst:
+                for line in src:
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        break  # a torn final line from an interrupted write
+                    dst.write(line if line.endswith("\n") else line + "\n")
+                    self.completed += 1
+            tmp.replace(self.journal_path)
+            self._journal = self.journal_path.open("a", encoding="utf-8")
+        else:
+            self._journal = self.journal_path.open("w", encoding="utf-8")
+        return frontier
+
+    def pages(self):
+        # Streams the pages journaled before this resume; each call re-reads the file.
+        if not self.completed:
+            return
+        with self.journal_path.open(encoding="utf-8") as fh:
+            for line in islice(fh, self.completed):
+                yield json.loads(line)
+
+    def record(self, page):
+        self._journal.write(json.dumps(page, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        self._since_save += 1
+        return self._since_save >= self.every
+
+    def save(self, frontier, lastmods):
+        tmp = self.frontier_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"frontier": frontier, "lastmods": lastmods, "run": self.run_id}), encoding="utf-8")
+        tmp.replace(self.frontier_path)
+        self._since_save = 0
+
+    def clear(self):
+        if self._journal:
+            self._journal.close()
+        self.frontier_path.unlink(missing_ok=True)
+        self.journal_path.unlink(missing_ok=True)
+
+
+def check_link(url):
+    started = time.time()
+    method = "HEAD"
+    try:
+        resp = HTTP_POOL.request("HEAD", url)
+        if resp["status"] in HEAD_FALLBACK_STATUSES:
+            # Plenty of CDNs and app servers reject HEAD; a one-byte ranged GET is the next cheapest probe.
+            method = "GET"
+            resp = HTTP_POOL.request("GET", url, {"Range": "bytes=0-0"}, consume=lambda r: r.read(LINK_CHECK_READ))
+    except Exception as e:
+        return {"status": 0, "method": method, "elapsed_ms": int((time.time() - started) * 1000), "error": str(e)}
+    return {
+        "status": resp["status"],
+        "method": method,
+        "final_url": normalize_url(resp["url"]),
+        "elapsed_ms": int((time.time() - started) * 1000),
+    }
+
+
+class LinkChecker:
+    def __init__(self, internal_hosts, workers=LINK_CHECK_WORKERS, per_host=LINK_CHECK_PER_HOST, page_weight=None):
+        self.internal_hosts = set(internal_hosts)
+        # When the page-weight stage is downloading assets anyway, its GET
+        # doubles as the asset's link check.
+        self.page_weight = page_weight
+        self._limiter = HostLimiter(per_host)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        # One future per distinct URL for the whole run, shared by every site.
+        self._results = {}
+        self._referrers = defaultdict(dict)
+
+    def _check(self, url):
+        with self._limiter.slot(url):
+            return check_link(url)
+
+    def collect(self, site, page):
+        refs = self._referrers[site]
+        outbound = [link for link in page["links"] if urlparse(link).netloc not in self.internal_hosts]
+        assets = page.get("assets", [])
+        for url in outbound + assets:
+            ref = refs.get(url)
+            if ref is None:
+                ref = refs[url] = {"count": 0, "pages": []}
+                if url not in self._results:
+                    if self.page_weight and url in assets:
+                        self._results[url] = self.page_weight.future(url)
+                    else:
+                        self._results[url] = self._pool.submit(self._check, url)
+            ref["count"] += 1
+            if len(ref["pages"]) < LINK_SAMPLE_PAGES:
+                ref["pages"].append(page["url"])
+
+    def report(self, site):
+        refs = self._referrers.pop(site, {})
+        broken = []
+        for url, ref in refs.items():
+            result = self._results[url].result()
+            if result["status"] == 0 or result["status"] >= 400:
+                probe = {k: result[k] for k in ("status", "method", "final_url", "elapsed_ms", "error") if k in result}
+                broken.append({"url": url, **probe, "referrers": ref["count"], "pages": ref["pages"]})
+        broken.sort(key=lambda x: x["referrers"], reverse=True)
+        return {"checked": len(refs), "broken": broken}
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+def asset_kind(content_type, url):
+    path = urlparse(url).path.lower()
+    if "javascript" in content_type or path.endswith((".js", ".mjs")):
+        return "script"
+    if "css" in content_type or path.endswith(".css"):
+        return "stylesheet"
+    if content_type.startswith("font/") or "font" in content_type or path.endswith((".woff", ".woff2", ".ttf", ".otf")):
+        return "font"
+    if content_type.startswith("image/"):
+        return "image"
+    return "other"
+
+
+def fetch_asset(url, headers=None):
+    started = time.time()
+    info = {"truncated": False}
+
+    def consume(resp):
+        raw = resp.read(ASSET_MAX_BYTES)
+        info["truncated"] = bool(resp.read(1))
+        return raw
+
+    try:
+        resp = HTTP_POOL.request("GET", url, {"Accept-Encoding": ACCEPT_ENCODING, **(headers or {})}, consume=consume)
+    except Exception as e:
+        return {"status": 0, "method": "GET", "elapsed_ms": int((time.time() - started) * 1000), "error": str(e)}
+    return {
+        "status": resp["status"],
+        "method": "GET",
+        "final_url": normalize_url(resp["url"]),
+        "elapsed_ms": int((time.time() - started) * 1000),
+        "headers": resp["headers"],
+        "raw": resp["body"] or b"",
+        "truncated": info["truncated"],
+    }
+
+
+class AssetStore:
+    # Content-addressed: blobs are named by the SHA-256 of the decoded body, so a
+    # bundle served under several URLs (cache-busting query strings, CDN aliases)
+    # is stored once. The URL index keeps validators and measurements for
+    # conditional re-fetches on the next run.
+    def __init__(self, directory=ASSET_CACHE_DIR, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.index_path = self.directory / "index.json"
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self.entries = {}
+        self._lock = threading.Lock()
+        if self.index_path.exists():
+            try:
+                self.entries = json.loads(self.index_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def blob_path(self, digest):
+        return self.directory / "objects" / digest[:2] / digest
+
+    def validators(self, url):
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or not self.blob_path(entry["sha256"]).exists():
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def revalidated(self, url):
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry:
+                entry["used"] = time.time()
+                self.stats["hits"] += 1
+            return dict(entry["measure"]) if entry else None
+
+    def store(self, url, headers, body, measure):
+        digest = measure["sha256"]
+        path = self.blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(body)
+            tmp.replace(path)
+            self.stats["blobs_written"] += 1
+        with self._lock:
+            self.entries[url] = {
+                "sha256": digest,
+                "etag": headers.get("etag", ""),
+                "last_modified": headers.get("last-modified", ""),
+                "used": time.time(),
+                "measure": measure,
+            }
+            self.stats["stored"] += 1
+
+    def save(self):
+        # Keep the most recently used URLs whose blobs fit the byte budget, then
+        # delete blobs nothing points at any more.
+        ordered = sorted(self.entries.items(), key=lambda kv: kv[1].get("used", 0), reverse=True)
+        kept, digests, total = {}, set(), 0
+        for url, entry in ordered:
+            digest = entry["sha256"]
+            if digest not in digests:
+                size = entry["measure"]["bytes"]
+                if total + size > self.max_bytes:
+                    self.stats["evicted"] += 1
+                    continue
+                digests.add(digest)
+                total += size
+            kept[url] = entry
+        self.entries = kept
+        objects = self.directory / "objects"
+        if objects.exists():
+            for path in objects.glob("*/*"):
+                if path.name not in digests:
+                    path.unlink(missing_ok=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(kept), encoding="utf-8")
+        tmp.replace(self.index_path)
+
+
+class PageWeightAuditor:
+    def __init__(self, store=None, workers=ASSET_WORKERS, per_host=ASSET_PER_HOST):
+        self.store = store
+        self._limiter = HostLimiter(per_host)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self._lock = threading.Lock()
+        # One future per distinct asset URL for the whole run, shared by every
+        # site and by LinkChecker, so each asset is downloaded at most once.
+        self._results = {}
+        self._pages = defaultdict(list)
+
+    def _measure(self, url):
+        validators = self.store.validators(url) if self.store else {}
+        res = self._limiter.fetch_with(fetch_asset, url, validators)
+        if res["status"] == 304 and self.store:
+            measure = self.store.revalidated(url)
+            if measure:
+                return {**measure, "status": 200, "elapsed_ms": res["elapsed_ms"], "cached": True}
+        base = {k: res[k] for k in ("status", "method", "final_url", "elapsed_ms", "error") if k in res}
+        if res["status"] != 200:
+            return base
+        headers = res["headers"]
+        encoding = headers.get("content-encoding", "").lower()
+        body = decode_body(res["raw"], encoding)
+        if body is None or res["truncated"]:
+            body = res["raw"]
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        measure = {
+            **base,
             "content_type": content_type,
-            "is_html": is_html,
-            "title": extract_first(r"<title[^>]*>(.*?)</title>", body) if is_html else "",
-            "meta_description": extract_meta(body, "description") if is_html else "",
-            "og_title": extract_meta(body, "og:title") if is_html else "",
-            "canonical": extract_first(r"<link[^>]+rel=[\"']canonical[\"'][^>]+href=[\"']([^\"']+)[\"']", body) if is_html else "",
-            "h1_count": len(re.findall(r"<h1\b", body, flags=re.I)) if is_html else 0,
-            "links": [],
-            "security_headers": {
-                "strict-transport-security": res["headers"].get("strict-transport-security", ""),
-                "content-security-policy": res["headers"].get("content-security-policy", ""),
-                "x-content-type-options": res["headers"].get("x-content-type-options", ""),
-            },
+            "kind": asset_kind(content_type, url),
+            "encoding": encoding if encoding not in {"", "identity"} else "",
+            "bytes": len(body),
+            "wire_bytes": len(res["raw"]),
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "truncated": res["truncated"],
+            "gzip_bytes": None,
         }
+        if not measure["encoding"] and len(body) >= UNCOMPRESSED_MIN_BYTES and any(t in content_type for t in COMPRESSIBLE_TYPES):
+            measure["gzip_bytes"] = len(zlib.compress(body, 6))
+        if self.store and not res["truncated"]:
+            self.store.store(url, headers, body, measure)
+        return measure
 
-        if is_html and page["status"] < 400:
-            links = extract_links(body, current)
-            page["links"] = links
-            for link in links:
-                if urlparse(link).netloc == urlparse(origin).netloc and link not in queued and link not in visited:
-                    queued.add(link)
-                    queue.append(link)
+    def future(self, url):
+        with self._lock:
+            result = self._results.get(url)
+            if result is None:
+                result = self._results[url] = self._pool.submit(self._measure, url)
+            return result
 
-        page["issues"] = page_issues(page)
-        pages.append(page)
+    def collect(self, site, page):
+        if not page.get("is_html") or page["status"] >= 400:
+            return
+        assets = page.get("assets", [])
+        for url in assets:
+            self.future(url)
+        self._pages[site].append((page["url"], page.get("bytes", 0), page.get("wire_bytes", page.get("bytes", 0)), tuple(assets)))
+
+    def report(self, site):
+        pages = self._pages.pop(site, [])
+        referrers = Counter(url for _, _, _, assets in pages for url in set(assets))
+        measures = {url: self._results[url].result() for url in referrers}
+        by_type = defaultdict(lambda: {"count": 0, "bytes": 0, "wire_bytes": 0})
+        for m in measures.values():
+            if m["status"] == 200:
+                kind = by_type[m["kind"]]
+                kind["count"] += 1
+                kind["bytes"] += m["bytes"]
+                kind["wire_bytes"] += m["wire_bytes"]
+
+        weights = []
+        for url, html_bytes, html_wire, assets in pages:
+            ok = [measures[a] for a in set(assets) if measures[a]["status"] == 200]
+            weights.append(
+                {
+                    "url": url,
+                    "bytes": html_bytes + sum(m["bytes"] for m in ok),
+                    "wire_bytes": html_wire + sum(m["wire_bytes"] for m in ok),
+                    "assets": len(ok),
+                }
+            )
+        weights.sort(key=lambda w: w["bytes"], reverse=True)
+        totals = sorted(w["bytes"] for w in weights)
+
+        shared = [
+            {"url": url, "kind": m["kind"], "bytes": m["bytes"], "wire_bytes": m["wire_bytes"], "pages": referrers[url]}
+            for url, m in measures.items()
+            if m["status"] == 200 and referrers[url] > 1
+        ]
+        shared.sort(key=lambda x: x["wire_bytes"] * x["pages"], reverse=True)
+        uncompressed = [
+            {"url": url, "content_type": m["content_type"], "bytes": m["bytes"], "gzip_bytes": m["gzip_bytes"], "pages": referrers[url]}
+            for url, m in measures.items()
+            if m["status"] == 200 and m.get("gzip_bytes") is not None and m["gzip_bytes"] < m["bytes"] * 0.9
+        ]
+        uncompressed.sort(key=lambda x: x["bytes"] - x["gzip_bytes"], reverse=True)
+        by_content = defaultdict(list)
+        for url, m in measures.items():
+            if m["status"] == 200:
+                by_content[m["sha256"]].append(url)
+        duplicates = sorted((sorted(urls) for urls in by_content.values() if len(urls) > 1), key=len, reverse=True)
+
+        return {
+            "pages": len(weights),
+            "assets": len(measures),
+            "failed_assets": sum(1 for m in measures.values() if m["status"] != 200),
+            "median_page_bytes": totals[len(totals) // 2] if totals else 0,
+            "over_budget": sum(1 for t in totals if t > PAGE_WEIGHT_BUDGET),
+            "by_type": dict(sorted(by_type.items(), key=lambda kv: kv[1]["bytes"], reverse=True)),
+            "heaviest_pages": weights[:PAGE_WEIGHT_TOP],
+            "shared_bundles": shared[:PAGE_WEIGHT_TOP],
+            "uncompressed": uncompressed[:PAGE_WEIGHT_TOP],
+            "duplicate_content": duplicates[:PAGE_WEIGHT_TOP],
+        }
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+def crawl_site(
+    site,
+    workers=WORKERS,
+    per_host=PER_HOST_LIMIT,
+    cache=None,
+    max_pages=MAX_PAGES_PER_SITE,
+    sink=None,
+    checkpoint=None,
+    link_checker=None,
+    max_body_bytes=MAX_BODY_BYTES,
+    page_weight=None,
+    bloom_capacity=0,
+    archive=None,
+):
+    base = normalize_url(site)
+    origin = f"{urlparse(base).scheme}://{urlparse(base).netloc}"
+    pool_before = HTTP_POOL.snapshot()
+    cache_before = dict(cache.stats) if cache else {}
+    limiter = HostLimiter(per_host)
+    robots = load_robots(origin)
+    crawl_delay = robots_delay(robots)
+    if crawl_delay:
+        limiter.throttle(origin).set_min_interval(crawl_delay)
+    robots_blocked = 0
+
+    frontier = CrawlFrontier(bloom_capacity)
+    frontier.add(base, 0, sitemap=True)
+    pages = []
+    stats = CrawlAggregates()
+    graph = None if frontier.bloom else LinkGraph(frontier.table)
+    lastmods = {}
+    host = urlparse(origin).netloc
+
+    def follow(page):
+        depth = page.get("depth")
+        for link in page["links"]:
+            if urlparse(link).netloc == host:
+                frontier.add(link, UNKNOWN_DEPTH if depth is None else depth + 1)
+
+    def emit(page):
+        stats.add(page)
+        if graph:
+            graph.add(page["url"], [link for link in page["links"] if urlparse(link).netloc == host])
+        if link_checker:
+            link_checker.collect(origin, page)
+        if page_weight:
+            page_weight.collect(origin, page)
+        # Signatures only feed the near-duplicate index; reports never carry them.
+        record = {key: value for key, value in page.items() if key != "minhash"}
+        # With a sink, page records leave memory as soon as they are audited.
+        if sink:
+            sink(record)
+        else:
+            pages.append(record)
+
+    resumed = 0
+    if checkpoint:
+        saved = checkpoint.start()
+        if saved:
+            frontier.restore(saved.get("frontier", saved))
+            lastmods.update(saved["lastmods"])
+        for page in checkpoint.pages():
+            frontier.mark_visited(page["url"])
+        # Journaled pages are complete even if they finished after the last
+        # frontier save; replaying their links restores anything discovered since.
+        for page in checkpoint.pages():
+            follow(page)
+            emit(page)
+        resumed = checkpoint.completed
+    run_id = checkpoint.run_id if checkpoint else uuid.uuid4().hex
+
+    # Sitemap URLs stream in from a background reader and join the frontier as
+    # they arrive, so a large sitemap never holds up the start of the crawl.
+    incoming = Queue()
+    sitemap_stop = threading.Event()
+    sitemap_done = threading.Event()
+
+    def read_sitemaps():
+        try:
+            stream_sitemaps(
+                origin,
+                lambda url, lastmod: incoming.put((url, lastmod)),
+                sitemap_stop,
+                extra_roots=robots.site_maps() or (),
+            )
+        finally:
+            sitemap_done.set()
+
+    def drain_sitemaps(timeout=None):
+        try:
+            item = incoming.get(timeout=timeout) if timeout else incoming.get_nowait()
+            while True:
+                url, lastmod = item
+                lastmods.setdefault(url, lastmod)
+                frontier.add(url, sitemap=True)
+                item = incoming.get_nowait()
+        except Empty:
+            pass
+
+    sitemap_thread = threading.Thread(target=read_sitemaps, daemon=True)
+    sitemap_thread.start()
+
+    # Fetches run ahead of the frontier in a bounded window, but results are
+    # consumed in submission order so `pages` comes out in frontier order, the
+    # same as a sequential crawl.
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque()
+        try:
+            while stats.count < max_pages:
+                drain_sitemaps()
+                while frontier and len(pending) < max(1, workers) and stats.count + len(pending) < max_pages:
+                    popped = frontier.pop()
+                    if popped is None:
+                        break
+                    current, depth = popped
+                    if not robots.can_fetch(USER_AGENT, current):
+                        robots_blocked += 1
+                        continue
+                    # Archived pages need full bodies, so archiving skips conditional requests.
+                    validators = cache.validators(current) if cache and not archive else None
+                    future = pool.submit(limiter.fetch_with, fetch, current, validators, max_body_bytes, HTML_TYPES, bool(archive))
+                    pending.append((current, depth, future))
+                METRICS.set("site_audit_frontier_urls", {"site": origin}, len(frontier))
+                METRICS.set("site_audit_in_flight_requests", {"site": origin}, len(pending))
+                if not pending:
+                    if sitemap_done.is_set() and incoming.empty():
+                        break
+                    drain_sitemaps(timeout=0.05)
+                    continue
+
+                # The head stays in `pending` until it is journaled, so an
+                # interrupt while it is being audited puts it back on resume.
+                current, depth, future = pending[0]
+                res = future.result()
+                page = cache.revalidated(current, res) if cache else None
+                if page is None:
+                    page = build_page(current, res)
+                    if cache:
+                        cache.store(current, res, page)
+                page["lastmod"] = lastmods.get(current, "")
+                page["depth"] = None if depth == UNKNOWN_DEPTH else depth
+                if archive:
+                    archive.write_response(origin, current, res, page["lastmod"], page["depth"], run_id)
+
+                follow(page)
+                page["issues"] = page_issues(page)
+                METRICS.record_page(origin, page)
+                emit(page)
+                saving = checkpoint and checkpoint.record(page)
+                pending.popleft()
+                if saving:
+                    checkpoint.save(frontier.state([(url, d) for url, d, _ in pending]), lastmods)
+        except BaseException:
+            sitemap_stop.set()
+            if checkpoint:
+                checkpoint.save(frontier.state([(url, d) for url, d, _ in pending]), lastmods)
+            raise
 
-    status_hist = Counter([p["status"] for p in pages])
-    issue_hist = Counter()
-    for p in pages:
-        issue_hist.update(p["issues"])
+    sitemap_stop.set()
+    sitemap_thread.join()
+    METRICS.set("site_audit_frontier_urls", {"site": origin}, len(frontier))
+    METRICS.set("site_audit_in_flight_requests", {"site": origin}, 0)
+    if checkpoint:
+        checkpoint.clear()
+    if archive:
+        archive.write_site(origin, lastmods, complete=stats.count < max_pages, run=run_id)
 
     route_probe = []
-    if len(pages) <= 3:
+    if stats.count <= 3:
         for route in ROUTE_PROBE_PATHS:
             probe_url = normalize_url(origin + route)
-            if probe_url in visited:
+            if probe_url in frontier:
                 continue
             probe_res = fetch(probe_url)
-            snippet = probe_res["body"][:1200]
-            title = extract_first(r"<title[^>]*>(.*?)</title>", snippet)
-            canonical = extract_first(r"<link[^>]+rel=[\"']canonical[\"'][^>]+href=[\"']([^\"']+)[\"']", probe_res["body"])
+            extracted = parse_page(probe_res["body"], probe_url)
             route_probe.append(
                 {
                     "url": probe_url,
                     "status": probe_res["status"],
-                    "title": title,
-                    "canonical": canonical,
+                    "title": extracted["title"],
+                    "canonical": extracted["canonical"],
                     "body_hash": hashlib.md5(probe_res["body"].encode("utf-8", errors="ignore")).hexdigest()[:12],
                 }
             )
 
-    return {
+    result = {
         "site": origin,
-        "scanned_pages": len(pages),
-        "discovered_urls": len(queued),
-        "status_histogram": dict(sorted(status_hist.items())),
-        "issue_histogram": dict(issue_hist.most_common()),
-        "pages": pages,
+        "scanned_pages": stats.count,
+        "discovered_urls": frontier.discovered,
+        "sitemap_urls": len(lastmods),
+        "resumed_pages": resumed,
+        "status_histogram": dict(sorted(stats.status_hist.items())),
+        "issue_histogram": dict(stats.issue_hist.most_common()),
+        "riskiest_pages": stats.riskiest(),
+        "latency": stats.latency_report(),
+        "transfer": {**stats.transfer, "encodings": dict(stats.encodings.most_common())},
+        "near_duplicates": stats.duplicates.groups(),
+        "link_graph": graph.report(base, lastmods, complete=stats.count < max_pages) if graph else None,
         "route_probe": route_probe,
+        "connections": connection_delta(pool_before, HTTP_POOL.snapshot()),
+        "throttle": {**limiter.report(), "robots_blocked": robots_blocked, "crawl_delay_s": crawl_delay},
+        "cache": {key: cache.stats.get(key, 0) - cache_before.get(key, 0) for key in ("hits", "stored")} if cache else {},
     }
+    if not sink:
+        result["pages"] = pages
+    return result
+
+
+class MonitorState:
+    # Per-URL memory between monitor cycles: the sitemap lastmod last acted on,
+    # the last status and issue keys, and when the URL was last fetched. `known`
+    # is every sitemap URL seen so far (None until the first sitemap read) and
+    # `fresh` the ones that joined the sitemap later and have not been fetched yet.
+    def __init__(self, site, directory=CHECKPOINT_DIR):
+        self.path = Path(directory) / f"monitor-{site_slug(site)}.json"
+        self.cycles = 0
+        self.entries = {}
+        self.known = None
+        self.fresh = set()
+        if self.path.exists():
+            try:
+                saved = json.loads(self.path.read_text(encoding="utf-8"))
+                self.cycles, self.entries = saved["cycles"], saved["entries"]
+                if saved.get("known") is not None:
+                    self.known, self.fresh = set(saved["known"]), set(saved.get("fresh", ()))
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def observe_sitemap(self, urls):
+        # The first sitemap read is the baseline; anything that shows up after it is new.
+        urls = set(urls)
+        if not urls:
+            return  # an unreadable sitemap says nothing about which URLs are new
+        if self.known is not None:
+            self.fresh |= urls - self.known
+        self.known = (self.known or set()) | urls
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        state = {
+            "cycles": self.cycles,
+            "entries": self.entries,
+            "known": sorted(self.known) if self.known is not None else None,
+            "fresh": sorted(self.fresh),
+        }
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def monitor_plan(base, lastmods, state, budget=MONITOR_BUDGET, sweep=MONITOR_SWEEP):
+    # Changed or new sitemap entries first (newest lastmod first), then URLs
+    # that failed last time, then the least recently checked of the rest.
+    entries = state.entries
+    changed = [url for url, lastmod in lastmods.items() if url not in entries or (lastmod and lastmod != entries[url]["lastmod"])]
+    if base not in entries:
+        changed.insert(0, base)
+    changed.sort(key=lambda url: lastmods.get(url, ""), reverse=True)
+    chosen = set(changed)
+    failing = [url for url, e in entries.items() if (e["status"] == 0 or e["status"] >= 400) and url not in chosen]
+    chosen.update(failing)
+    rest = sorted(
+        (url for url in {base, *lastmods, *entries} if url not in chosen),
+        key=lambda url: (entries.get(url, {}).get("checked", 0), len(url)),
+    )
+    plan = [(url, "changed") for url in changed] + [(url, "failing") for url in failing] + [(url, "sweep") for url in rest[:sweep]]
+    return plan[:budget], max(0, len(changed) - budget)
+
+
+def monitor_findings(url, reason, previous, page, is_new=False):
+    issues = {issue_key(issue) for issue in page["issues"]}
+    findings = []
+    if previous is None:
+        # A URL's first fetch is its baseline, whichever cycle the budget
+        # reaches it in. Only a URL that joined the sitemap after the first
+        # read is reported, once, as a new page.
+        if is_new:
+            findings.append({"kind": "new_page", "status": page["status"], "issues": sorted(issues)})
+    else:
+        before_issues, before_status = set(previous["issues"]), previous["status"]
+        if before_status != page["status"]:
+            findings.append({"kind": "status_change", "from": before_status, "to": page["status"]})
+        findings += [{"kind": "new_issue", "issue": issue} for issue in sorted(issues - before_issues)]
+        findings += [{"kind": "resolved", "issue": issue} for issue in sorted(before_issues - issues)]
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return [{"at": stamp, "url": url, "reason": reason, "lastmod": page.get("lastmod", ""), **f} for f in findings]
+
+
+def monitor_cycle(site, state, limiter, cache=None, budget=MONITOR_BUDGET, sweep=MONITOR_SWEEP, workers=WORKERS, emit=None):
+    base = normalize_url(site)
+    origin = site_of(base)
+    # Re-read every cycle, so a changed Crawl-delay or Sitemap: line applies to the next poll.
+    robots = load_robots(origin)
+    limiter.throttle(origin).set_min_interval(robots_delay(robots))
+    lastmods = gather_sitemap_urls(origin, robots.site_maps() or ())
+    state.observe_sitemap(lastmods)
+    plan, backlog = monitor_plan(base, lastmods, state, budget, sweep)
+    counts = Counter(reason for _, reason in plan)
+
+    def audit(url):
+        validators = cache.validators(url) if cache else None
+        res = limiter.fetch(url, validators)
+        page = cache.revalidated(url, res) if cache else None
+        if page is None:
+            page = build_page(url, res)
+            if cache:
+                cache.store(url, res, page)
+        page["lastmod"] = lastmods.get(url, "")
+        page["issues"] = page_issues(page)
+        METRICS.record_page(origin, page)
+        return page
+
+    findings = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(audit, url): (url, reason) for url, reason in plan if robots.can_fetch(USER_AGENT, url)}
+        # Findings go out as each page lands rather than at the end of the cycle.
+        for future in as_completed(futures):
+            url, reason = futures[future]
+            page = future.result()
+            previous = state.entries.get(url)
+            for finding in monitor_findings(url, reason, previous, page, url in state.fresh):
+                findings += 1
+                if emit:
+                    emit({"site": origin, **finding})
+            state.fresh.discard(url)
+            state.entries[url] = {
+                "lastmod": page["lastmod"] or (previous or {}).get("lastmod", ""),
+                "status": page["status"],
+                "issues": sorted({issue_key(issue) for issue in page["issues"]}),
+                "checked": time.time(),
+            }
+    state.cycles += 1
+    state.save()
+    return {"site": origin, "fetched": len(futures), **counts, "findings": findings, "changed_backlog": backlog}
+
+
+def monitor(sites, interval=MONITOR_INTERVAL_S, budget=MONITOR_BUDGET, sweep=MONITOR_SWEEP, workers=WORKERS, per_host=PER_HOST_LIMIT, cache=None, emit=None, cycles=None):
+    states = {site: MonitorState(site) for site in sites}
+    limiter = HostLimiter(per_host)
+    done = 0
+    while cycles is None or done < cycles:
+        started = time.monotonic()
+        for site in sites:
+            summary = monitor_cycle(site, states[site], limiter, cache, budget, sweep, workers, emit)
+            print(
+                f"  {summary['site']}: {summary['fetched']} fetched "
+                f"({summary.get('changed', 0)} changed, {summary.get('failing', 0)} failing, {summary.get('sweep', 0)} sweep), "
+                f"{summary['findings']} finding(s), {summary['changed_backlog']} changed URL(s) deferred"
+            )
+        if cache:
+            cache.save()
+        done += 1
+        if cycles is None or done < cycles:
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
 
 
 def top_issues(issue_hist, n=12):
@@ -271,12 +2580,43 @@ def build_plan(result):
             critical.append(f"Fix {count} broken URL(s) returning {issue.split(' ')[1]}.")
         elif issue in {"Missing <title>", "Missing meta description", "Missing H1", "Missing canonical"}:
             high.append(f"Resolve \"{issue}\" on {count} page(s) via shared templates/components.")
+        elif issue == "HTML served uncompressed":
+            high.append(f"Enable gzip or brotli for HTML responses ({count} page(s) served uncompressed).")
         elif issue.startswith("Slow response"):
             high.append(f"Improve performance on {count} page(s) exceeding 3s response time.")
         elif issue.startswith("Missing ") and "header" in issue:
             high.append(f"Set {issue.replace('Missing ', '').replace(' header', '')} globally ({count} checks).")
         else:
             medium.append(f"Address \"{issue}\" on {count} page(s).")
+    near_dups = result.get("near_duplicates", [])
+    if near_dups:
+        high.append(
+            f"Differentiate or canonicalize {len(near_dups)} near-duplicate page group(s) covering "
+            f"{sum(g['size'] for g in near_dups)} pages (fallback shells, soft 404s or duplicate templates)."
+        )
+    graph = result.get("link_graph")
+    if graph:
+        if graph["orphan_sitemap_urls"]:
+            high.append(
+                f"Link {graph['orphan_sitemap_urls']} orphan sitemap URL(s) from navigation or related content, "
+                "or drop them from the sitemap."
+            )
+        if graph["deep_pages"]:
+            medium.append(f"Bring {graph['deep_pages']} page(s) within {DEEP_PAGE_DEPTH - 1} clicks of the homepage.")
+    weight = result.get("page_weight")
+    if weight:
+        if weight["over_budget"]:
+            high.append(
+                f"Cut JS, CSS, font and image weight on {weight['over_budget']} page(s) over "
+                f"{PAGE_WEIGHT_BUDGET // (1024 * 1024)} MiB; start with the heaviest shared bundles."
+            )
+        if weight["uncompressed"]:
+            high.append(f"Serve {len(weight['uncompressed'])} text asset(s) with gzip or brotli compression.")
+        if weight["duplicate_content"]:
+            medium.append(f"Consolidate {len(weight['duplicate_content'])} set(s) of byte-identical assets served under several URLs.")
+    broken = result.get("link_check", {}).get("broken", [])
+    if broken:
+        critical.append(f"Fix or remove {len(broken)} broken external/asset URL(s) referenced from crawled pages.")
     return {"critical": critical, "high": high, "medium": medium}
 
 
@@ -324,7 +2664,7 @@ Definition of done:
 def render_markdown(results):
     sections = []
     for r in results:
-        risky = sorted([p for p in r["pages"] if p["issues"]], key=lambda x: len(x["issues"]), reverse=True)[:15]
+        risky = r["riskiest_pages"]
         plan = build_plan(r)
         probe_block = ""
         if r.get("route_probe"):
@@ -335,12 +2675,110 @@ def render_markdown(results):
                 ]
             )
             probe_block = f"\n### Route Probe (fallback-route detection)\n{probe_rows}\n"
+        link_block = ""
+        if r.get("link_check"):
+            broken = r["link_check"]["broken"]
+            rows = "\n".join(
+                f"- {x['url']} -> {x['status'] or 'ERR'} ({x['method']}); linked from {x['referrers']} page(s), e.g. {x['pages'][0]}"
+                for x in broken[:15]
+            )
+            link_block = (
+                f"\n### External & Asset Links\n"
+                f"- **Unique URLs checked:** {r['link_check']['checked']}\n"
+                f"- **Broken:** {len(broken)}\n" + (rows + "\n" if rows else "")
+            )
+        graph_block = ""
+        if r.get("link_graph"):
+            g = r["link_graph"]
+            depths = ", ".join(f"{level}: {count}" for level, count in g["depth_histogram"].items())
+            top = "\n".join(f"| {x['url']} | {x['pagerank']} | {x['inlinks']} | {x['depth']} |" for x in g["top_pagerank"][:10])
+            orphans = "\n".join(f"- {url}" for url in g["orphan_sample"][:10])
+            graph_block = (
+                "\n### Internal Link Graph\n"
+                f"- **Nodes / edges:** {g['nodes']} / {g['edges']}\n"
+                f"- **Click depth:** {depths or 'n/a'}; {g['deep_pages']} page(s) at depth {DEEP_PAGE_DEPTH}+, "
+                f"{g['unreachable_pages']} reachable only via sitemap\n"
+                f"- **Orphan sitemap URLs:** {g['orphan_sitemap_urls']}"
+                + ("" if g["complete"] else " (crawl hit the page cap; some may be linked from unvisited pages)")
+                + "\n"
+                + (orphans + "\n" if orphans else "")
+                + ("\n| Page | PageRank (1 = average) | Inlinks | Depth |\n|---|---|---|---|\n" + top + "\n" if top else "")
+            )
+        weight_block = ""
+        if r.get("page_weight"):
+            w = r["page_weight"]
+            kib = lambda n: f"{n / 1024:,.0f} KiB"
+            kinds = ", ".join(f"{kind} {kib(t['wire_bytes'])} ({t['count']})" for kind, t in w["by_type"].items())
+            heavy = "\n".join(
+                f"| {p['url']} | {kib(p['bytes'])} | {kib(p['wire_bytes'])} | {p['assets']} |" for p in w["heaviest_pages"]
+            )
+            shared = "\n".join(f"- {b['url']} ({b['kind']}): {kib(b['wire_bytes'])} on {b['pages']} page(s)" for b in w["shared_bundles"])
+            raw = "\n".join(
+                f"- {a['url']}: {kib(a['bytes'])} uncompressed, ~{kib(a['gzip_bytes'])} gzipped" for a in w["uncompressed"]
+            )
+            weight_block = (
+                "\n### Page Weight\n"
+                f"- **Median page:** {kib(w['median_page_bytes'])} decoded; {w['over_budget']} page(s) over "
+                f"{kib(PAGE_WEIGHT_BUDGET)}\n"
+                f"- **Unique assets:** {w['assets']} ({w['failed_assets']} failed); transfer by type: {kinds or 'none'}\n"
+                + ("\n| Page | Decoded | Transfer | Assets |\n|---|---|---|---|\n" + heavy + "\n" if heavy else "")
+                + ("\n**Heaviest shared bundles**\n" + shared + "\n" if shared else "")
+                + ("\n**Uncompressed text assets**\n" + raw + "\n" if raw else "")
+            )
+        dup_block = ""
+        if r.get("near_duplicates"):
+            rows = "\n".join(
+                f"- {g['size']} pages, similarity >= {g['similarity']}: {', '.join(g['urls'][:3])}" for g in r["near_duplicates"][:10]
+            )
+            dup_block = f"\n### Near-Duplicate Page Groups\n{rows}\n"
+        latency_block = ""
+        if r.get("latency"):
+            rows = []
+            for group, lat in list(r["latency"].items())[:10]:
+                total = lat["total_ms"]
+                setup = sum(lat.get(phase, {}).get("p95", 0) for phase in ("dns_ms", "connect_ms", "tls_ms"))
+                rows.append(
+                    f"| `{group}` | {lat['count']} | {total['p50']} / {total['p95']} / {total['p99']} | "
+                    f"{lat.get('ttfb_ms', {}).get('p95', 0)} | {lat.get('download_ms', {}).get('p95', 0)} | {setup} |"
+                )
+            latency_block = (
+                "\n### Latency by Route Family (ms)\n"
+                "| Route | Pages | Total p50 / p95 / p99 | TTFB p95 | Download p95 | DNS+TCP+TLS p95 |\n"
+                "|---|---|---|---|---|---|\n" + "\n".join(rows) + "\n"
+            )
+
+        transfer_line = ""
+        if r.get("transfer", {}).get("bytes"):
+            t = r["transfer"]
+            encodings = ", ".join(f"{k}: {v}" for k, v in t["encodings"].items())
+            transfer_line = (
+                f"- **HTML transfer:** {t['wire_bytes'] / 1024:,.0f} KiB on the wire, {t['bytes'] / 1024:,.0f} KiB decoded "
+                f"({t['wire_bytes'] / t['bytes']:.0%}); encodings: {encodings}\n"
+            )
+        throttle_line = ""
+        if r.get("throttle"):
+            t = r["throttle"]
+            events = ", ".join(f"{k}: {v}" for k, v in sorted(t["events"].items())) or "none"
+            throttle_line = (
+                f"- **Throttling:** {events}; robots.txt blocked {t['robots_blocked']} URL(s)"
+                + (f"; crawl-delay {t['crawl_delay_s']}s" if t["crawl_delay_s"] else "")
+                + "\n"
+            )
 
         sections.append(
             f"## {r['site']}\n\n"
             f"- **Pages scanned:** {r['scanned_pages']}\n"
             f"- **Discovered internal URLs:** {r['discovered_urls']}\n"
-            f"- **Status histogram:** {', '.join([f'{k}: {v}' for k,v in r['status_histogram'].items()])}\n\n"
+            f"- **Sitemap URLs:** {r.get('sitemap_urls', 0)}\n"
+            f"- **Status histogram:** {', '.join([f'{k}: {v}' for k,v in r['status_histogram'].items()])}\n"
+            + (
+                f"- **Replayed from:** `{r['replayed_from']}` (no network)\n"
+                if r.get("replayed_from")
+                else f"- **Connections:** {r['connections']['opened']} opened, {r['connections']['reused']} reused\n"
+            )
+            + throttle_line
+            + transfer_line
+            + "\n"
             f"### Top Issue Patterns\n"
             + "\n".join([f"- {issue}: {count}" for issue, count in top_issues(r["issue_histogram"], 12)])
             + "\n\n### Highest-Risk URLs (sample)\n"
@@ -353,6 +2791,11 @@ def render_markdown(results):
             + "\n\n**Medium**\n"
             + ("\n".join([f"- {x}" for x in plan["medium"]]) if plan["medium"] else "- none in crawl sample")
             + "\n"
+            + latency_block
+            + graph_block
+            + weight_block
+            + link_block
+            + dup_block
             + probe_block
         )
 
@@ -367,27 +2810,431 @@ def render_markdown(results):
     )
 
 
-def main():
-    results = []
-    for site in SITES:
-        print(f"Auditing {site} ...")
-        results.append(crawl_site(site))
+def issue_key(issue):
+    # "Slow response (3412ms)" should compare equal across runs whatever the measurement.
+    return ISSUE_MEASUREMENT_RE.sub("", issue)
+
+
+def site_of(url):
+    p = urlparse(url)
+    return f"{p.scheme}://{p.netloc}"
+
+
+def report_pages(path):
+    path = Path(path)
+    if path.suffix == ".ndjson":
+        with path.open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with path.open(encoding="utf-8") as fh:
+        results = json.load(fh)
+    for result in results:
+        yield from result.get("pages", [])
+    # Streamed runs keep their page records next to the summary JSON.
+    if any("pages" not in result for result in results) and path.with_suffix(".ndjson").exists():
+        yield from report_pages(path.with_suffix(".ndjson"))
+
+
+def diff_reports(old_path, new_path):
+    # Index the older report once by URL, then stream the newer one against it:
+    # every comparison is a dict lookup, never a scan over the other page list.
+    before = {}
+    before_counts = Counter()
+    for page in report_pages(old_path):
+        before[page["url"]] = (page["status"], frozenset(issue_key(i) for i in page["issues"]), page["elapsed_ms"])
+        before_counts[site_of(page["url"])] += 1
+
+    sites = {}
+
+    def site_delta(site):
+        if site not in sites:
+            sites[site] = {
+                "site": site,
+                "pages_before": before_counts.get(site, 0),
+                "pages_after": 0,
+                "added_pages": [],
+                "removed_pages": [],
+                "new_issue_histogram": Counter(),
+                "resolved_issue_histogram": Counter(),
+                "status_changes": 0,
+                "latency_regressions": 0,
+                "changed_pages": [],
+            }
+        return sites[site]
+
+    for page in report_pages(new_path):
+        delta = site_delta(site_of(page["url"]))
+        delta["pages_after"] += 1
+        previous = before.pop(page["url"], None)
+        if previous is None:
+            delta["added_pages"].append(page["url"])
+            continue
+        old_status, old_issues, old_ms = previous
+        issues = {issue_key(i) for i in page["issues"]}
+        change = {"url": page["url"]}
+        if page["status"] != old_status:
+            change["status"] = [old_status, page["status"]]
+            delta["status_changes"] += 1
+        if issues - old_issues:
+            change["new_issues"] = sorted(issues - old_issues)
+            delta["new_issue_histogram"].update(change["new_issues"])
+        if old_issues - issues:
+            change["resolved_issues"] = sorted(old_issues - issues)
+            delta["resolved_issue_histogram"].update(change["resolved_issues"])
+        ms = page["elapsed_ms"]
+        if ms - old_ms >= LATENCY_REGRESSION_MS and ms >= old_ms * LATENCY_REGRESSION_RATIO:
+            change["elapsed_ms"] = [old_ms, ms]
+            delta["latency_regressions"] += 1
+        if len(change) > 1:
+            delta["changed_pages"].append(change)
+
+    for url in before:
+        site_delta(site_of(url))["removed_pages"].append(url)
+
+    out = []
+    for delta in sites.values():
+        delta["new_issue_histogram"] = dict(delta["new_issue_histogram"].most_common())
+        delta["resolved_issue_histogram"] = dict(delta["resolved_issue_histogram"].most_common())
+        out.append(delta)
+    return out
+
 
+def render_diff_markdown(deltas, old_path, new_path):
+    sections = []
+    for d in deltas:
+        status_rows = [c for c in d["changed_pages"] if "status" in c]
+        slow_rows = sorted(
+            (c for c in d["changed_pages"] if "elapsed_ms" in c), key=lambda c: c["elapsed_ms"][1] - c["elapsed_ms"][0], reverse=True
+        )
+        sections.append(
+            f"## {d['site']}\n\n"
+            f"- **Pages:** {d['pages_before']} -> {d['pages_after']} (+{len(d['added_pages'])} / -{len(d['removed_pages'])})\n"
+            f"- **Status changes:** {d['status_changes']}\n"
+            f"- **Latency regressions:** {d['latency_regressions']}\n\n"
+            "### New Issues\n"
+            + ("\n".join(f"- {issue}: {count}" for issue, count in d["new_issue_histogram"].items()) or "- none")
+            + "\n\n### Resolved Issues\n"
+            + ("\n".join(f"- {issue}: {count}" for issue, count in d["resolved_issue_histogram"].items()) or "- none")
+            + "\n\n### Status Changes\n"
+            + ("\n".join(f"- {c['url']}: {c['status'][0]} -> {c['status'][1]}" for c in status_rows[:20]) or "- none")
+            + "\n\n### Latency Regressions\n"
+            + ("\n".join(f"- {c['url']}: {c['elapsed_ms'][0]}ms -> {c['elapsed_ms'][1]}ms" for c in slow_rows[:20]) or "- none")
+            + "\n\n### Removed Pages (sample)\n"
+            + ("\n".join(f"- {url}" for url in d["removed_pages"][:10]) or "- none")
+            + "\n"
+        )
+    return f"# Website Audit Delta\n\n`{Path(old_path).name}` -> `{Path(new_path).name}`\n\n" + "\n".join(sections)
+
+
+def previous_report(out, before):
+    reports = sorted(
+        p
+        for p in out.glob("website-audit-*.json")
+        if p.name < before.name and not p.name.startswith("website-audit-diff-") and not p.stem.endswith("-replay")
+    )
+    return reports[-1] if reports else None
+
+
+def write_diff(old_path, new_path, out):
+    deltas = diff_reports(old_path, new_path)
+    stem = f"website-audit-diff-{Path(old_path).stem.replace('website-audit-', '')}-to-{Path(new_path).stem.replace('website-audit-', '')}"
+    json_path = out / f"{stem}.json"
+    md_path = out / f"{stem}.md"
+    json_path.write_text(json.dumps(deltas, indent=2), encoding="utf-8")
+    md_path.write_text(render_diff_markdown(deltas, old_path, new_path), encoding="utf-8")
+    print(f"Saved: {json_path}")
+    print(f"Saved: {md_path}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Crawl the BSI sites and write dated audit reports to docs/audits.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help=f"Concurrent fetch workers per site. Use 1 for a sequential crawl. Default: {WORKERS}.",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=PER_HOST_LIMIT,
+        help=f"Maximum in-flight requests to a single host. Default: {PER_HOST_LIMIT}.",
+    )
+    parser.add_argument(
+        "--cache",
+        default=str(CACHE_PATH),
+        help=f"Conditional-GET response cache file. Default: {CACHE_PATH}.",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Fetch every URL unconditionally and skip the cache.")
+    parser.add_argument(
+        "--max-pages",
+        type=int,
+        default=MAX_PAGES_PER_SITE,
+        help=f"Maximum pages to audit per site. Default: {MAX_PAGES_PER_SITE}.",
+    )
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=MAX_BODY_BYTES,
+        help=f"Stop reading an HTML body after this many bytes. Non-HTML bodies are never read. Default: {MAX_BODY_BYTES}.",
+    )
+    parser.add_argument(
+        "--bloom-capacity",
+        type=int,
+        default=0,
+        help="Track seen URLs in a Bloom filter sized for this many URLs instead of exactly. "
+        "Keeps memory flat on very large crawls but disables the link graph. Default: 0 (exact).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Continue each site from its last checkpoint in {CHECKPOINT_DIR} instead of starting over.",
+    )
+    parser.add_argument(
+        "--skip-link-check",
+        action="store_true",
+        help="Do not verify off-site links and asset URLs.",
+    )
+    parser.add_argument(
+        "--skip-page-weight",
+        action="store_true",
+        help="Do not download page subresources to measure JS, CSS, font and image weight.",
+    )
+    parser.add_argument(
+        "--asset-cache",
+        default=str(ASSET_CACHE_DIR),
+        help=f"Content-addressed subresource cache directory. Disabled by --no-cache. Default: {ASSET_CACHE_DIR}.",
+    )
+    parser.add_argument(
+        "--archive",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help=f"Append every raw response to a WARC-style archive for offline replay. Default path: {ARCHIVE_DIR}/website-audit-DATE.warc.",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="ARCHIVE",
+        help="Re-run extraction and issue rules over an archive from --archive, with no network access.",
+    )
+    parser.add_argument(
+        "--replay-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes used by --replay. Default: one per CPU.",
+    )
+    parser.add_argument(
+        "--monitor",
+        action="store_true",
+        help="Run continuously: poll sitemaps and re-audit changed, failing and stale URLs each cycle, "
+        "appending findings to docs/audits/website-monitor-DATE.ndjson.",
+    )
+    parser.add_argument(
+        "--monitor-interval",
+        type=float,
+        default=MONITOR_INTERVAL_S,
+        help=f"Seconds between monitor cycles. Default: {MONITOR_INTERVAL_S}.",
+    )
+    parser.add_argument(
+        "--monitor-budget",
+        type=int,
+        default=MONITOR_BUDGET,
+        help=f"Maximum pages fetched per site per cycle. Default: {MONITOR_BUDGET}.",
+    )
+    parser.add_argument(
+        "--monitor-sweep",
+        type=int,
+        default=MONITOR_SWEEP,
+        help=f"Least recently checked pages added to each cycle as a background sweep. Default: {MONITOR_SWEEP}.",
+    )
+    parser.add_argument(
+        "--monitor-cycles",
+        type=int,
+        help="Stop after this many cycles, e.g. when run from cron. Default: run until interrupted.",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help=f"Rewrite crawl metrics to this file every {METRICS_WRITE_S}s and at exit. "
+        "A .prom file gets Prometheus text for node_exporter's textfile collector; otherwise OpenMetrics.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve crawl metrics at http://127.0.0.1:PORT/metrics while the audit runs; 0 picks a free port and prints it.",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="After the crawl, write a delta report against the most recent earlier audit in docs/audits.",
+    )
+    parser.add_argument(
+        "--diff-only",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two existing audit reports (.json or .ndjson) without crawling.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write page records to an NDJSON file as they are audited instead of holding them in the JSON report.",
+    )
+    return parser.parse_args()
+
+
+def run(args):
+    # Keep as many idle keep-alive sockets per host as --per-host lets run at once,
+    # or every connection beyond the default cap pays a new handshake.
+    HTTP_POOL.max_idle_per_host = max(PER_HOST_LIMIT, args.per_host)
     out = Path("docs/audits")
     out.mkdir(parents=True, exist_ok=True)
     today = date.today().isoformat()
 
+    if args.diff_only:
+        write_diff(*args.diff_only, out)
+        return
+
+    if args.monitor:
+        if args.monitor_budget < 1 or args.monitor_sweep < 0:
+            raise SystemExit("--monitor-budget must be at least 1 and --monitor-sweep 0 or more.")
+        cache = None if args.no_cache else ResponseCache(args.cache)
+        findings_path = out / f"website-monitor-{today}.ndjson"
+        print(f"Monitoring {len(SITES)} site(s) every {args.monitor_interval:g}s; findings -> {findings_path}")
+
+        with NdjsonWriter(findings_path, append=True, flush=True) as writer:
+
+            def emit(finding):
+                writer.write(finding)
+                print(f"    [{finding['kind']}] {finding['url']} {finding.get('issue', '')}{finding.get('from', '')}{' -> ' + str(finding['to']) if 'to' in finding else ''}")
+
+            try:
+                monitor(
+                    SITES,
+                    interval=args.monitor_interval,
+                    budget=args.monitor_budget,
+                    sweep=args.monitor_sweep,
+                    workers=args.workers,
+                    per_host=args.per_host,
+                    cache=cache,
+                    emit=emit,
+                    cycles=args.monitor_cycles,
+                )
+            except KeyboardInterrupt:
+                print("Monitor stopped.")
+        HTTP_POOL.close()
+        return
+
+    if args.replay:
+        if args.replay_workers < 1:
+            raise SystemExit("--replay-workers must be at least 1.")
+        started = time.time()
+        json_path = out / f"website-audit-{today}-replay.json"
+        ndjson_path = out / f"website-audit-{today}-replay.ndjson"
+        md_path = out / f"website-audit-{today}-replay.md"
+        with NdjsonWriter(ndjson_path) as writer:
+            results = replay_archive(args.replay, args.replay_workers, args.max_body_bytes, sink=writer.write)
+        print(f"Replayed {sum(r['scanned_pages'] for r in results)} pages in {time.time() - started:.1f}s")
+        with json_path.open("w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        md_path.write_text(render_markdown(results), encoding="utf-8")
+        print(f"Saved: {json_path}")
+        print(f"Saved: {ndjson_path}")
+        print(f"Saved: {md_path}")
+        return
+
     json_path = out / f"website-audit-{today}.json"
+    ndjson_path = out / f"website-audit-{today}.ndjson"
     md_path = out / f"website-audit-{today}.md"
     prompt_path = out / f"website-remediation-prompt-{today}.txt"
 
-    json_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    cache = None if args.no_cache else ResponseCache(args.cache)
+    page_weight = None if args.skip_page_weight else PageWeightAuditor(None if args.no_cache else AssetStore(args.asset_cache))
+    link_checker = None if args.skip_link_check else LinkChecker((urlparse(site).netloc for site in SITES), page_weight=page_weight)
+    if args.archive is not None:
+        archive_path = Path(args.archive or ARCHIVE_DIR / f"website-audit-{today}.warc")
+    results = []
+    with NdjsonWriter(ndjson_path) if args.stream else nullcontext() as writer, (
+        ResponseArchive(archive_path) if args.archive is not None else nullcontext()
+    ) as archive:
+        for site in SITES:
+            print(f"Auditing {site} ...")
+            sink = (lambda page, site=site: writer.write({"site": site, **page})) if writer else None
+            results.append(
+                crawl_site(
+                    site,
+                    workers=args.workers,
+                    per_host=args.per_host,
+                    cache=cache,
+                    max_pages=args.max_pages,
+                    sink=sink,
+                    checkpoint=CrawlCheckpoint(site, resume=args.resume),
+                    link_checker=link_checker,
+                    max_body_bytes=args.max_body_bytes,
+                    page_weight=page_weight,
+                    bloom_capacity=args.bloom_capacity,
+                    archive=archive,
+                )
+            )
+            if results[-1]["resumed_pages"]:
+                print(f"  resumed {results[-1]['resumed_pages']} pages from checkpoint")
+            conns = results[-1]["connections"]
+            print(f"  {results[-1]['scanned_pages']} pages, {conns['opened']} connections opened, {conns['reused']} reused")
+            if cache:
+                print(f"  {results[-1]['cache']['hits']} cache revalidations (304)")
+    if link_checker:
+        # Checks run in the background while later sites crawl; collect them per site now.
+        for result in results:
+            result["link_check"] = link_checker.report(result["site"])
+            print(f"  {result['site']}: {result['link_check']['checked']} external/asset URLs, {len(result['link_check']['broken'])} broken")
+        link_checker.close()
+    if page_weight:
+        for result in results:
+            result["page_weight"] = page_weight.report(result["site"])
+            w = result["page_weight"]
+            print(f"  {result['site']}: {w['assets']} assets, median page {w['median_page_bytes'] // 1024} KiB, {len(w['uncompressed'])} uncompressed")
+        page_weight.close()
+        if page_weight.store:
+            page_weight.store.save()
+    HTTP_POOL.close()
+    if cache:
+        cache.save()
+
+    with json_path.open("w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2)
     md_path.write_text(render_markdown(results), encoding="utf-8")
     prompt_path.write_text(prompt_script(results), encoding="utf-8")
 
     print(f"Saved: {json_path}")
+    if args.stream:
+        print(f"Saved: {ndjson_path}")
     print(f"Saved: {md_path}")
     print(f"Saved: {prompt_path}")
+    if args.archive is not None:
+        print(f"Saved: {archive_path}")
+
+    if args.diff:
+        previous = previous_report(out, json_path)
+        if previous:
+            write_diff(previous, json_path, out)
+        else:
+            print("No earlier audit to diff against.")
+
+
+def main():
+    args = parse_args()
+    if args.workers < 1 or args.per_host < 1:
+        raise SystemExit("--workers and --per-host must be at least 1.")
+    if args.max_pages < 1 or args.max_body_bytes < 1:
+        raise SystemExit("--max-pages and --max-body-bytes must be at least 1.")
+    if args.bloom_capacity < 0:
+        raise SystemExit("--bloom-capacity must be 0 or more.")
+    if args.metrics_port is not None and not 0 <= args.metrics_port <= 65535:
+        raise SystemExit("--metrics-port must be between 0 and 65535.")
+    exporting = args.metrics_file or args.metrics_port is not None
+    with MetricsExporter(args.metrics_file, args.metrics_port) if exporting else nullcontext():
+        run(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from html import unescape
+from html.parser import HTMLParser
+from pathlib import Path
+
+import site_audit
+from site_audit_fixture import synthetic_page
+
+
+class LegacyLinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.links = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag.lower() != "a":
+            return
+        href = dict(attrs).get("href")
+        if href:
+            self.links.add(href.strip())
+
+
+def legacy_extract_first(pattern, text):
+    m = re.search(pattern, text, flags=re.I | re.S)
+    return unescape(m.group(1).strip()) if m else ""
+
+
+def legacy_extract_meta(text, key):
+    m = re.search(rf'<meta[^>]+(?:name|property)=["\']{re.escape(key)}["\'][^>]+content=["\']([^"\']+)["\']', text, flags=re.I)
+    return unescape(m.group(1).strip()) if m else ""
+
+
+def legacy_extract(body, base):
+    # The per-field regex path crawl_site used before scan_page, kept as the benchmark baseline.
+    is_html = "<!doctype html" in body.lower()
+    parser = LegacyLinkParser()
+    parser.feed(body)
+    return {
+        "is_html": is_html,
+        "title": legacy_extract_first(r"<title[^>]*>(.*?)</title>", body),
+        "meta_description": legacy_extract_meta(body, "description"),
+        "og_title": legacy_extract_meta(body, "og:title"),
+        "canonical": legacy_extract_first(r"<link[^>]+rel=[\"']canonical[\"'][^>]+href=[\"']([^\"']+)[\"']", body),
+        "h1_count": len(re.findall(r"<h1\b", body, flags=re.I)),
+        "links": site_audit.resolve_links(parser.links, base),
+    }
+
+
+def current_extract(body, base):
+    return {"is_html": site_audit.looks_like_html(body, ""), **site_audit.parse_page(body, base)}
+
+
+def time_call(fn, body, base, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(body, base)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def bench_extract(args):
+    if args.files:
+        bodies = [(Path(f).read_text(encoding="utf-8", errors="replace"), f"https://blazesportsintel.com/{Path(f).stem}") for f in args.files]
+    else:
+        bodies = [(synthetic_page(i, payload_kb=args.payload_kb), f"https://blazesportsintel.com/page/{i}") for i in range(args.pages)]
+
+    legacy_ms, current_ms, mismatches = 0.0, 0.0, 0
+    for body, base in bodies:
+        legacy, current = legacy_extract(body, base), current_extract(body, base)
+        if any(legacy[key] != current[key] for key in legacy):
+            mismatches += 1
+        legacy_ms += time_call(legacy_extract, body, base, args.repeat)
+        current_ms += time_call(current_extract, body, base, args.repeat)
+
+    total_kb = sum(len(body) for body, _ in bodies) / 1024
+    print(f"pages: {len(bodies)}  total: {total_kb:.0f} KiB  repeat: {args.repeat}")
+    print(f"legacy regex path : {legacy_ms / len(bodies):8.2f} ms/page")
+    print(f"single-pass parser: {current_ms / len(bodies):8.2f} ms/page")
+    print(f"speedup           : {legacy_ms / current_ms:8.2f}x")
+    if mismatches:
+        print(f"WARNING: {mismatches} page(s) extracted differently between the two paths")
+
+
+def peak_rss_mib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def start_fixture(args):
+    cmd = [
+        sys.executable,
+        str(Path(__file__).with_name("site_audit_fixture.py")),
+        "--port",
+        "0",
+        "--pages",
+        str(args.pages),
+        "--links",
+        str(args.links),
+        "--payload-kb",
+        str(args.payload_kb),
+        "--latency-ms",
+        str(args.latency_ms),
+        "--jitter-ms",
+        str(args.jitter_ms),
+        "--error-rate",
+        str(args.error_rate),
+    ]
+    # The fixture runs in its own process so its CPU and memory stay out of the measurement.
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+    origin = proc.stdout.readline().strip()
+    if not origin:
+        proc.kill()
+        raise SystemExit("Fixture server failed to start.")
+    return proc, origin
+
+
+def bench_crawl(args):
+    proc, origin = start_fixture(args)
+    try:
+        runs = []
+        site_audit.HTTP_POOL.max_idle_per_host = max(site_audit.PER_HOST_LIMIT, args.per_host)
+        for _ in range(args.repeat):
+            site_audit.HTTP_POOL.close()
+            wall, cpu = time.perf_counter(), time.process_time()
+            result = site_audit.crawl_site(origin, workers=args.workers, per_host=args.per_host, max_pages=args.max_pages, sink=lambda page: None)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            runs.append({"pages": result["scanned_pages"], "wall_s": wall, "cpu_s": cpu})
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    best = max(runs, key=lambda r: r["pages"] / r["wall_s"])
+    report = {
+        "pages": best["pages"],
+        "pages_per_sec": round(best["pages"] / best["wall_s"], 1),
+        "cpu_ms_per_page": round(best["cpu_s"] * 1000 / max(1, best["pages"]), 2),
+        "peak_rss_mib": round(peak_rss_mib(), 1),
+        "workers": args.workers,
+        "per_host": args.per_host,
+        "latency_ms": args.latency_ms,
+        "payload_kb": args.payload_kb,
+    }
+    print(f"pages          : {report['pages']}")
+    print(f"pages/sec      : {report['pages_per_sec']}")
+    print(f"CPU per page   : {report['cpu_ms_per_page']} ms")
+    print(f"peak RSS       : {report['peak_rss_mib']} MiB")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.min_pages_per_sec and report["pages_per_sec"] < args.min_pages_per_sec:
+        raise SystemExit(f"Throughput regression: {report['pages_per_sec']} pages/sec < {args.min_pages_per_sec}.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks for scripts/site_audit.py.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    extract = sub.add_parser("extract", help="Compare the single-pass HTML extractor with the legacy regex path.")
+    extract.add_argument("files", nargs="*", help="Saved HTML pages to benchmark. Default: synthetic Next.js-shaped pages.")
+    extract.add_argument("--pages", type=int, default=5, help="Synthetic pages to generate. Default: 5.")
+    extract.add_argument("--payload-kb", type=int, default=256, help="Approximate inline JSON payload per synthetic page. Default: 256.")
+    extract.add_argument("--repeat", type=int, default=5, help="Timed runs per page; the median is reported. Default: 5.")
+    extract.set_defaults(func=bench_extract)
+
+    crawl = sub.add_parser("crawl", help="Measure crawl_site throughput against a local fixture site.")
+    crawl.add_argument("--pages", type=int, default=1000, help="Pages in the fixture site. Default: 1000.")
+    crawl.add_argument("--max-pages", type=int, default=1000, help="Crawl cap passed to crawl_site. Default: 1000.")
+    crawl.add_argument("--links", type=int, default=40, help="Internal links per fixture page. Default: 40.")
+    crawl.add_argument("--payload-kb", type=int, default=16, help="Inline JSON payload per fixture page. Default: 16.")
+    crawl.add_argument("--latency-ms", type=float, default=20, help="Fixture response delay. Default: 20.")
+    crawl.add_argument("--jitter-ms", type=float, default=10, help="Random extra fixture delay. Default: 10.")
+    crawl.add_argument("--error-rate", type=float, default=0.02, help="Fraction of fixture pages returning 404/500. Default: 0.02.")
+    crawl.add_argument("--workers", type=int, default=site_audit.WORKERS, help=f"crawl_site workers. Default: {site_audit.WORKERS}.")
+    crawl.add_argument("--per-host", type=int, default=site_audit.PER_HOST_LIMIT, help=f"crawl_site per-host cap. Default: {site_audit.PER_HOST_LIMIT}.")
+    crawl.add_argument("--repeat", type=int, default=1, help="Crawls to run; the fastest is reported. Default: 1.")
+    crawl.add_argument("--json", help="Also write the measurements to this JSON file.")
+    crawl.add_argument("--min-pages-per-sec", type=float, help="Exit non-zero when throughput falls below this floor.")
+    crawl.set_defaults(func=bench_crawl)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+def synthetic_page(index=0, pages=997, links=400, payload_kb=256):
+    # Shaped like a Next.js App Router page: large inline flight/JSON payload,
+    # deep markup, and hundreds of internal links.
+    payload = json.dumps({"props": {"pageProps": {"rows": [{"id": i, "team": f"Team {i}", "note": "x" * 40} for i in range(payload_kb * 12)]}}})
+    anchors = "".join(f'<li><a class="nav-link" href="/page/{(index * 7 + i * 13) % pages}">Team {i}</a></li>' for i in range(links))
+    cards = "".join(
+        f'<div class="card"><svg viewBox="0 0 10 10"><title>icon {i}</title></svg><span>Stat {index}-{i}</span></div>' for i in range(links // 2)
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head>"
+        f"<title>College Baseball Page {index} | Blaze Sports Intel</title>"
+        f'<meta name="description" content="Live scores, standings and analytics for page {index} across college baseball.">'
+        f'<meta property="og:title" content="Page {index} | BSI">'
+        f'<link rel="canonical" href="/page/{index}">'
+        f'<link rel="preload" href="/_next/static/chunks/main-{index % 5}.js" as="script">'
+        "</head><body><header><h1>Page heading</h1><nav><ul>"
+        + anchors
+        + "</ul></nav></header><main>"
+        + cards
+        + f'</main><script id="__NEXT_DATA__" type="application/json">{payload}</script></body></html>'
+    )
+
+
+class FixtureSite:
+    def __init__(
+        self,
+        pages=1000,
+        links=40,
+        payload_kb=16,
+        latency_ms=0,
+        jitter_ms=0,
+        error_rate=0.0,
+        sitemap_chunk=500,
+        gzip_sitemaps=True,
+        seed=7,
+    ):
+        self.pages = pages
+        self.links = links
+        self.payload_kb = payload_kb
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.sitemap_chunk = max(1, sitemap_chunk)
+        self.gzip_sitemaps = gzip_sitemaps
+        self.seed = seed
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def _roll(self, *key):
+        digest = hashlib.blake2b(repr((self.seed, *key)).encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") / 2**64
+
+    def error_status(self, index):
+        # Deterministic per URL, so repeated benchmark runs hit the same broken pages.
+        roll = self._roll("error", index)
+        if roll >= self.error_rate:
+            return None
+        return 500 if roll < self.error_rate / 2 else 404
+
+    def delay(self):
+        if self.latency_ms or self.jitter_ms:
+            time.sleep((self.latency_ms + random.random() * self.jitter_ms) / 1000)
+
+    def page(self, index):
+        with self._lock:
+            body = self._bodies.get(index)
+        if body is None:
+            body = synthetic_page(index, self.pages, self.links, self.payload_kb).encode()
+            with self._lock:
+                self._bodies[index] = body
+        return body
+
+    def sitemap_names(self):
+        suffix = ".xml.gz" if self.gzip_sitemaps else ".xml"
+        return [f"/sitemaps/pages-{n}{suffix}" for n in range((self.pages + self.sitemap_chunk - 1) // self.sitemap_chunk)]
+
+    def sitemap_index(self, host):
+        entries = "".join(f"<sitemap><loc>http://{host}{name}</loc></sitemap>" for name in self.sitemap_names())
+        return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'.encode()
+
+    def sitemap(self, host, chunk):
+        start = chunk * self.sitemap_chunk
+        entries = "".join(
+            f"<url><loc>http://{host}/page/{i}</loc><lastmod>2026-{1 + i % 12:02d}-{1 + i % 28:02d}</lastmod></url>"
+            for i in range(start, min(self.pages, start + self.sitemap_chunk))
+        )
+        return f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def respond(self, status, body=b"", content_type="text/html; charset=utf-8", head=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Strict-Transport-Security", "max-age=15552000")
+        self.send_header("X-Content-Type-Options", "nosniff")
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def route(self, head=False):
+        site = self.server.site
+        host = self.headers.get("Host", "localhost")
+        path = urlparse(self.path).path
+        site.delay()
+        if path == "/robots.txt":
+            return self.respond(200, f"User-agent: *\nAllow: /\nSitemap: http://{host}/sitemap_index.xml\n".encode(), "text/plain", head)
+        if path == "/sitemap_index.xml":
+            return self.respond(200, site.sitemap_index(host), "application/xml", head)
+        if path.startswith("/sitemaps/pages-"):
+            name = path.rsplit("/", 1)[-1]
+            chunk = int(name.split("-", 1)[1].split(".", 1)[0])
+            body = site.sitemap(host, chunk)
+            if name.endswith(".gz"):
+                return self.respond(200, gzip.compress(body), "application/gzip", head)
+            return self.respond(200, body, "application/xml", head)
+        if path.startswith("/_next/static/"):
+            return self.respond(200, b"/* bundle */" + b"x" * 64 * 1024, "application/javascript", head)
+        if path == "/":
+            return self.respond(200, site.page(0), head=head)
+        if path.startswith("/page/") and path[6:].isdigit() and int(path[6:]) < site.pages:
+            index = int(path[6:])
+            status = site.error_status(index)
+            if status:
+                return self.respond(status, f"<!doctype html><title>Error {status}</title>".encode(), head=head)
+            return self.respond(200, site.page(index), head=head)
+        return self.respond(404, b"<!doctype html><title>Not found</title>", head=head)
+
+    def do_GET(self):
+        self.route()
+
+    def do_HEAD(self):
+        self.route(head=True)
+
+
+def serve(site, host="127.0.0.1", port=0):
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    server.daemon_threads = True
+    server.site = site
+    return server
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve a synthetic site for offline site_audit crawls and benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address. Default: 127.0.0.1.")
+    parser.add_argument("--port", type=int, default=8800, help="Port to listen on; 0 picks a free one. Default: 8800.")
+    parser.add_argument("--pages", type=int, default=1000, help="Number of pages in the site. Default: 1000.")
+    parser.add_argument("--links", type=int, default=40, help="Internal links per page. Default: 40.")
+    parser.add_argument("--payload-kb", type=int, default=16, help="Approximate inline JSON payload per page. Default: 16.")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Fixed delay added to every response. Default: 0.")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay up to this many ms. Default: 0.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pages that return 404/500. Default: 0.")
+    parser.add_argument("--sitemap-chunk", type=int, default=500, help="URLs per child sitemap. Default: 500.")
+    parser.add_argument("--plain-sitemaps", action="store_true", help="Serve child sitemaps as .xml instead of .xml.gz.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for which pages fail. Default: 7.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.pages < 1:
+        raise SystemExit("--pages must be at least 1.")
+    if not 0 <= args.error_rate <= 1:
+        raise SystemExit("--error-rate must be between 0 and 1.")
+    site = FixtureSite(
+        pages=args.pages,
+        links=args.links,
+        payload_kb=args.payload_kb,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        sitemap_chunk=args.sitemap_chunk,
+        gzip_sitemaps=not args.plain_sitemaps,
+        seed=args.seed,
+    )
+    server = serve(site, args.host, args.port)
+    print(f"http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()